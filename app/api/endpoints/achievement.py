@@ -1,14 +1,11 @@
 import logging
 from typing import Annotated
 
-from fastapi import APIRouter, Body, Depends, HTTPException, Query
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response
 from fastapi_cache.decorator import cache
 
 from app.api.endpoints.user import get_current_admin
-from app.core.cache_constants import (
-    ACHIEVEMENT_IMAGES_NAMESPACE,
-    VOLUNTEER_RECEIVED_ACHIEVEMENTS_NAMESPACE,
-)
+from app.core.cache_constants import ACHIEVEMENT_IMAGES_NAMESPACE
 from app.models.achievement import achievement_model
 from app.schemas.achievement import (
     Achievement,
@@ -21,10 +18,7 @@ from app.schemas.s3 import PresignedUrlResponse
 from app.schemas.user import User
 from app.services.achievement import achievement_service
 from app.services.s3 import s3_service
-from app.utils.cache_key_builders import (
-    achievement_images_key_builder,
-    volunteer_received_achievements_key_builder,
-)
+from app.utils.cache_key_builders import achievement_images_key_builder
 
 logger = logging.getLogger(__name__)
 
@@ -36,24 +30,31 @@ async def post_achievement(
     achievement: Annotated[CreateAchievementRequest, Body(...)],
     current_user: Annotated[User, Depends(get_current_admin)],
 ):
-    return await achievement_model.create_achievement(achievement)
+    return await achievement_service.create_achievement(achievement)
 
 
 @router.get("/all", response_model=list[Achievement])
 async def get_achievements(
+    request: Request,
+    response: Response,
     event_type: Annotated[KarpEvent | None, Query()] = None,
     threshold_min: Annotated[int | None, Query()] = None,
     threshold_max: Annotated[int | None, Query()] = None,
 ) -> list[Achievement]:
-    return await achievement_model.get_all_achievements(event_type, threshold_min, threshold_max)
+    catalog = achievement_model.catalog
+    if catalog is None:
+        return await achievement_model.get_all_achievements(
+            event_type, threshold_min, threshold_max
+        )
+
+    # The ETag changes whenever the active catalog does, whatever the filters
+    if request.headers.get("if-none-match") == catalog.etag:
+        return Response(status_code=304, headers={"ETag": catalog.etag})
+    response.headers["ETag"] = catalog.etag
+    return catalog.find(event_type, threshold_min, threshold_max)
 
 
 @router.get("/volunteer/{volunteer_id}", response_model=list[VolunteerReceivedAchievementResponse])
-@cache(
-    namespace=VOLUNTEER_RECEIVED_ACHIEVEMENTS_NAMESPACE,
-    expire=60 * 60 * 24,  # cache for 24 hours
-    key_builder=volunteer_received_achievements_key_builder,
-)
 async def get_achievements_by_volunteer(
     volunteer_id: str,
 ) -> list[VolunteerReceivedAchievementResponse]:
@@ -76,7 +77,7 @@ async def deactivate_achievement(
 async def activate_achievement(
     achievement_id: str, current_user: Annotated[User, Depends(get_current_admin)]
 ):
-    await achievement_model.activate_achievement(achievement_id)
+    await achievement_service.activate_achievement(achievement_id)
     return {"message": "Achievement activated successfully"}
 
 
@@ -116,7 +117,7 @@ async def get_achievement_upload_url(
     )
 
     # Update the MongoDB document with the S3 key
-    await achievement_model.update_achievement_image(achievement_id, new_s3_key)
+    await achievement_service.update_achievement_image(achievement_id, new_s3_key)
 
     return PresignedUrlResponse(
         upload_url=url,
@@ -2,19 +2,30 @@ import logging
 from datetime import UTC, datetime
 from typing import Annotated, Literal
 
-from fastapi import APIRouter, Body, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, status
 
 from app.api.endpoints.user import get_current_admin, get_current_user
 from app.models.event import event_model
 from app.models.organization import org_model
 from app.models.registration import registration_model
-from app.schemas.event import CreateEventRequest, Event, EventStatus, UpdateEventRequest
+from app.schemas.event import (
+    CreateEventRequest,
+    Event,
+    EventFacetPage,
+    EventStatus,
+    UpdateEventRequest,
+)
+from app.schemas.map import MapClusterResponse
+from app.schemas.pagination import Page
 from app.schemas.s3 import PresignedUrlResponse
 from app.schemas.user import User, UserType
 from app.services.event import event_service
 from app.services.geocoding import geocoding_service
+from app.services.map_cluster import map_cluster_service
 from app.services.s3 import s3_service
 from app.services.similarity_computation import similarity_computation_service
+from app.utils.map_tiles import MAX_MAP_ZOOM, MIN_MAP_ZOOM
+from app.utils.streaming import get_stream_format, stream_models
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -22,7 +33,7 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
-@router.get("/all", response_model=list[Event])
+@router.get("/all", response_model=list[Event] | EventFacetPage)
 async def get_events(
     # Search term
     q: Annotated[str | None, Query(description="Search term (name, description, keywords)")] = None,
@@ -142,17 +153,15 @@ async def get_events(
     volunteer_id: Annotated[
         str | None, Query(description="Volunteer ID for 'been before' or 'recommendations' filter")
     ] = None,
-) -> list[Event]:
+    include_facets: Annotated[
+        bool,
+        Query(description="Return the page with the total and counts per keyword/weekday/status"),
+    ] = False,
+) -> list[Event] | EventFacetPage:
     # If city/state provided but no lat/lng, geocode the location
     if (location_city or location_state) and not (lat and lng):
-        if location_city and location_state:
-            address = f"{location_city}, {location_state}"
-        elif location_city:
-            address = location_city
-        else:
-            address = location_state
         try:
-            location = await geocoding_service.location_to_coordinates(address)
+            location = await geocoding_service.place_to_coordinates(location_city, location_state)
             lat = location.coordinates[1]
             lng = location.coordinates[0]
         except HTTPException as e:
@@ -171,6 +180,11 @@ async def get_events(
                 status_code=400,
                 detail='volunteer_id must be provided when sort_by="recommendations"',
             )
+        if include_facets:
+            raise HTTPException(
+                status_code=400,
+                detail='include_facets is not supported when sort_by="recommendations"',
+            )
 
         return await event_service.get_all_events_with_recommendations(
             volunteer_id=volunteer_id,
@@ -213,13 +227,24 @@ async def get_events(
         lat=lat,
         lng=lng,
         volunteer_event_ids=volunteer_event_ids,
+        include_facets=include_facets,
     )
 
 
-@router.get("/organization/{organization_id}", response_model=list[Event])
-async def get_events_by_org(organization_id: str) -> list[Event]:
-    event_list = await event_model.get_events_by_organization(organization_id)
-    return event_list
+@router.get("/organization/{organization_id}", response_model=Page[Event])
+async def get_events_by_org(
+    organization_id: str,
+    request: Request,
+    page: Annotated[int, Query(ge=1)] = 1,
+    limit: Annotated[int, Query(ge=1, le=200)] = 20,
+) -> Page[Event]:
+    if stream_format := get_stream_format(request):
+        events = event_model.iter_events_by_organization(organization_id)
+        return stream_models(events, stream_format)
+    event_list, total = await event_model.get_events_by_organization_page(
+        organization_id, page, limit
+    )
+    return Page(items=event_list, total=total, page=page, limit=limit)
 
 
 @router.get("/search", response_model=list[Event])
@@ -259,6 +284,19 @@ async def search_events(
     return returned_events
 
 
+@router.get("/map", response_model=MapClusterResponse)
+async def get_event_map(
+    west: Annotated[float, Query(ge=-180, le=180)],
+    south: Annotated[float, Query(ge=-90, le=90)],
+    east: Annotated[float, Query(ge=-180, le=180)],
+    north: Annotated[float, Query(ge=-90, le=90)],
+    zoom: Annotated[int, Query(ge=MIN_MAP_ZOOM, le=MAX_MAP_ZOOM)],
+) -> MapClusterResponse:
+    return await map_cluster_service.get_clusters(
+        "event", event_model.get_map_clusters, west, south, east, north, zoom
+    )
+
+
 @router.post("/new", response_model=Event)
 async def create_event(
     event: Annotated[CreateEventRequest, Body(...)],
@@ -426,7 +464,7 @@ async def clear_event_by_id(
     # Admins can bypass org authorization
     if current_user.user_type != UserType.ADMIN:
         await event_service.authorize_org(event_id, current_user.entity_id)
-    return await event_model.delete_event_by_id(event_id)
+    return await event_service.delete_event(event_id)
 
 
 # Generate a pre-signed URL for an event image and store the S3 key in MongoDB
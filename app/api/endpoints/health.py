@@ -1,4 +1,10 @@
-from fastapi import APIRouter
+from typing import Annotated
+
+from fastapi import APIRouter, Depends
+
+from app.api.endpoints.user import get_current_admin
+from app.schemas.user import User
+from app.services.cache import cache_service
 
 router = APIRouter()
 
@@ -6,3 +12,9 @@ router = APIRouter()
 @router.get("/", status_code=200)
 async def health_check():
     return {"status": "ok", "message": "API is running"}
+
+
+@router.get("/cache/stats", status_code=200)
+async def cache_stats(current_user: Annotated[User, Depends(get_current_admin)]):
+    # Counters are per worker process
+    return cache_service.get_stats()
@@ -8,11 +8,14 @@ from app.core.enums import SortOrder
 from app.models.item import ItemSortParam, item_model
 from app.models.vendor import vendor_model
 from app.schemas.item import CreateItemRequest, Item, ItemStatus, UpdateItemRequest
+from app.schemas.map import MapClusterResponse
 from app.schemas.s3 import PresignedUrlResponse
 from app.schemas.user import User, UserType
 from app.schemas.vendor import VendorStatus
 from app.services.item import item_service
+from app.services.map_cluster import map_cluster_service
 from app.services.s3 import s3_service
+from app.utils.map_tiles import MAX_MAP_ZOOM, MIN_MAP_ZOOM
 
 router = APIRouter()
 
@@ -68,6 +71,19 @@ async def get_items(
     )
 
 
+@router.get("/map", response_model=MapClusterResponse)
+async def get_item_map(
+    west: Annotated[float, Query(ge=-180, le=180)],
+    south: Annotated[float, Query(ge=-90, le=90)],
+    east: Annotated[float, Query(ge=-180, le=180)],
+    north: Annotated[float, Query(ge=-90, le=90)],
+    zoom: Annotated[int, Query(ge=MIN_MAP_ZOOM, le=MAX_MAP_ZOOM)],
+) -> MapClusterResponse:
+    return await map_cluster_service.get_clusters(
+        "item", item_model.get_map_clusters, west, south, east, north, zoom
+    )
+
+
 @router.get("/{item_id}", response_model=Item)
 async def get_item(item_id: str) -> Item:
     return await item_model.get_item_by_id(item_id)
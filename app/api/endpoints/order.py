@@ -1,16 +1,19 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Body, Depends, HTTPException, status
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, status
 
 from app.api.endpoints.user import get_current_admin, get_current_user
 from app.models.item import item_model
 from app.models.order import order_model
 from app.models.volunteer import volunteer_model
 from app.schemas.order import CreateOrderRequest, Order, UpdateOrderRequest
+from app.schemas.pagination import Page
 from app.schemas.user import User, UserType
 from app.services.order import order_service
 from app.schemas.order import OrderStatus
 from app.schemas.item import ItemStatus
+from app.utils.qr_token import QRTokenPurpose, is_signed_qr_token, verify_qr_token
+from app.utils.streaming import get_stream_format, stream_models
 
 router = APIRouter()
 
@@ -31,14 +34,21 @@ async def create_order(
             detail="You must be associated with a volunteer profile to place an order",
         )
 
-    # Validate order and process payment (deduct coins)
-    await order_service.validate_and_process_order(order.item_id, current_user.entity_id)
-    return await order_model.create_order(order, current_user.entity_id)
+    # Deduct coins and create the order
+    return await order_service.place_order(order, current_user.entity_id)
 
 
-@router.get("/all", response_model=list[Order])
-async def get_all_orders(current_user: Annotated[User, Depends(get_current_admin)]) -> list[Order]:
-    return await order_model.get_all_orders()
+@router.get("/all", response_model=Page[Order])
+async def get_all_orders(
+    request: Request,
+    current_user: Annotated[User, Depends(get_current_admin)],
+    page: Annotated[int, Query(ge=1)] = 1,
+    limit: Annotated[int, Query(ge=1, le=200)] = 20,
+) -> Page[Order]:
+    if stream_format := get_stream_format(request):
+        return stream_models(order_model.iter_all_orders(), stream_format)
+    orders, total = await order_model.get_orders_page(page, limit)
+    return Page(items=orders, total=total, page=page, limit=limit)
 
 
 @router.get("/{order_id}", response_model=Order)
@@ -49,11 +59,14 @@ async def get_order_by_id(
     return await order_service.authorize_order_access(order_id, current_user)
 
 
-@router.get("/item/{item_id}", response_model=list[Order])
+@router.get("/item/{item_id}", response_model=Page[Order])
 async def get_orders_by_item_id(
     item_id: str,
+    request: Request,
     current_user: Annotated[User, Depends(get_current_user)],
-) -> list[Order]:
+    page: Annotated[int, Query(ge=1)] = 1,
+    limit: Annotated[int, Query(ge=1, le=200)] = 20,
+) -> Page[Order]:
     if current_user.user_type == UserType.VENDOR:
         item = await item_model.get_item_by_id(item_id)
         if current_user.entity_id != item.vendor_id:
@@ -67,14 +80,20 @@ async def get_orders_by_item_id(
             detail="Only admins and vendors can view orders by item",
         )
 
-    return await order_model.get_orders_by_item_id(item_id)
+    if stream_format := get_stream_format(request):
+        return stream_models(order_model.iter_orders_by_item_id(item_id), stream_format)
+    orders, total = await order_model.get_orders_by_item_id_page(item_id, page, limit)
+    return Page(items=orders, total=total, page=page, limit=limit)
 
 
-@router.get("/volunteer/{volunteer_id}", response_model=list[Order])
+@router.get("/volunteer/{volunteer_id}", response_model=Page[Order])
 async def get_orders_by_volunteer_id(
     volunteer_id: str,
+    request: Request,
     current_user: Annotated[User, Depends(get_current_user)],
-) -> list[Order]:
+    page: Annotated[int, Query(ge=1)] = 1,
+    limit: Annotated[int, Query(ge=1, le=200)] = 20,
+) -> Page[Order]:
     volunteer = await volunteer_model.get_volunteer_by_id(volunteer_id)
     if not volunteer:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Volunteer not found")
@@ -87,7 +106,10 @@ async def get_orders_by_volunteer_id(
             )
     elif current_user.user_type != UserType.ADMIN:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
-    return await order_model.get_orders_by_volunteer_id(volunteer_id)
+    if stream_format := get_stream_format(request):
+        return stream_models(order_model.iter_orders_by_volunteer_id(volunteer_id), stream_format)
+    orders, total = await order_model.get_orders_by_volunteer_id_page(volunteer_id, page, limit)
+    return Page(items=orders, total=total, page=page, limit=limit)
 
 
 @router.put("/{order_id}", response_model=Order)
@@ -152,7 +174,12 @@ async def scan_item(order_id: str, qr_token: str, item_id: str, current_user: An
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Item not found")
     if item.status != ItemStatus.ACTIVE:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Item is not active")
-    if item.qr_token != qr_token:
+    # Signed tokens are verified without comparing against the stored token
+    if is_signed_qr_token(qr_token):
+        token_matches = verify_qr_token(qr_token, item_id, QRTokenPurpose.ITEM_REDEMPTION)
+    else:
+        token_matches = item.qr_token == qr_token
+    if not token_matches:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="QR token does not match")
     
     return await order_model.update_order_status(order_id, UpdateOrderRequest(order_status=OrderStatus.COMPLETED))
@@ -5,6 +5,7 @@ from fastapi import APIRouter, Body, Depends, HTTPException, Query, status
 from app.api.endpoints.user import get_current_user
 from app.models.organization import org_model
 from app.models.user import user_model
+from app.schemas.map import MapClusterResponse
 from app.schemas.organization import (
     CreateOrganizationRequest,
     Organization,
@@ -14,7 +15,9 @@ from app.schemas.organization import (
 from app.schemas.s3 import PresignedUrlResponse
 from app.schemas.user import User, UserType
 from app.services.geocoding import geocoding_service
+from app.services.map_cluster import map_cluster_service
 from app.services.s3 import s3_service
+from app.utils.map_tiles import MAX_MAP_ZOOM, MIN_MAP_ZOOM
 
 router = APIRouter()
 
@@ -65,6 +68,19 @@ async def search_organizations(
     )
 
 
+@router.get("/map", response_model=MapClusterResponse)
+async def get_organization_map(
+    west: Annotated[float, Query(ge=-180, le=180)],
+    south: Annotated[float, Query(ge=-90, le=90)],
+    east: Annotated[float, Query(ge=-180, le=180)],
+    north: Annotated[float, Query(ge=-90, le=90)],
+    zoom: Annotated[int, Query(ge=MIN_MAP_ZOOM, le=MAX_MAP_ZOOM)],
+) -> MapClusterResponse:
+    return await map_cluster_service.get_clusters(
+        "organization", org_model.get_map_clusters, west, south, east, north, zoom
+    )
+
+
 @router.get("/{org_id}", response_model=Organization)
 async def get_organization_by_id(org_id: str) -> Organization:
     organization = await org_model.get_organization_by_id(org_id)
@@ -1,23 +1,36 @@
-from datetime import UTC, datetime, timedelta
 from typing import Annotated
 
-from fastapi import APIRouter, Body, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, status
 
 from app.api.endpoints.user import get_current_user
 from app.models.event import event_model
 from app.models.registration import registration_model
 from app.models.volunteer import volunteer_model
 from app.schemas.event import Event
-from app.schemas.registration import CreateRegistrationRequest, Registration, RegistrationStatus
+from app.schemas.registration import (
+    BulkScanRequest,
+    CreateRegistrationRequest,
+    Registration,
+    RegistrationStatus,
+    ScanResult,
+)
 from app.schemas.user import User, UserType
+from app.services.registration import registration_service
 from app.services.volunteer import volunteer_service
+from app.utils.qr_token import QRTokenPurpose
+from app.utils.streaming import get_stream_format, stream_models
 
 router = APIRouter()
 
 
 # do we want to make this partiful s.t. only volunteers signed up for the event can see who going?
 @router.get("/event-volunteers/{event_id}", response_model=list[Registration])
-async def get_volunteers_by_event(event_id: str) -> list[Registration]:
+async def get_volunteers_by_event(event_id: str, request: Request) -> list[Registration]:
+    if stream_format := get_stream_format(request):
+        # Check the event before the response starts, errors can't be sent mid-stream
+        if not await event_model.get_event_by_id(event_id):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Event not found")
+        return stream_models(registration_model.iter_volunteers_by_event(event_id), stream_format)
     return await registration_model.get_volunteers_by_event(event_id)
 
 
@@ -92,40 +105,11 @@ async def check_in_registration(
             detail="Only volunteers can check in for events",
         )
     volunteer_id = current_user.entity_id
-    volunteer = await volunteer_model.get_volunteer_by_id(volunteer_id)
-    if not volunteer:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Volunteer not found")
-
-    event = await event_model.get_event_by_id(event_id)
-    if not event:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Event not found")
-
-    if event.check_in_qr_token != qr_token:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid QR Code for Event"
-        )
-
-    check_in_start = event.start_date_time - timedelta(minutes=15)
-    check_in_end = event.start_date_time + timedelta(minutes=30)
-    current_time = datetime.now(UTC)
-
-    if current_time < check_in_start or current_time > check_in_end:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="You can't check in for this Event as this time.",
-        )
-
-    upcoming_events = await registration_model.get_events_by_volunteer(
-        volunteer_id, RegistrationStatus.UPCOMING
+    await registration_service.validate_scan(
+        event_id, qr_token, QRTokenPurpose.CHECK_IN, status.HTTP_400_BAD_REQUEST
     )
-    volunteer_signed_up = any(event.id == event.id for event in upcoming_events)
-
-    if not volunteer_signed_up:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Volunteer did not sign up for this event",
-        )
 
+    # Checks the signup and sets clocked_in in one write
     return await registration_model.check_in_registration(volunteer_id, event_id)
 
 
@@ -143,43 +127,29 @@ async def check_out_registration(
         )
 
     volunteer_id = current_user.entity_id
-    volunteer = await volunteer_model.get_volunteer_by_id(volunteer_id)
-    if not volunteer:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Volunteer not found")
-
-    event = await event_model.get_event_by_id(event_id)
-    if not event:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Event not found")
-
-    if event.check_out_qr_token != qr_token:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Invalid QR Code for Event"
-        )
+    event = await registration_service.validate_scan(
+        event_id, qr_token, QRTokenPurpose.CHECK_OUT, status.HTTP_404_NOT_FOUND
+    )
 
-    check_out_start = event.end_date_time - timedelta(minutes=15)
-    check_out_end = event.end_date_time + timedelta(minutes=30)
-    current_time = datetime.now(UTC)
+    # Checks the signup, sets clocked_out and completes the registration in one write
+    registration = await registration_model.check_out_registration(volunteer_id, event_id)
+    # Rewards depend on the event's coins and times
+    event = event or await event_model.get_event_by_id(event_id)
+    await volunteer_service.handle_volunteer_checkout_rewards(registration, volunteer_id, event)
 
-    if current_time > check_out_start and current_time < check_out_end:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="You can't check out for this Event as this time.",
-        )
+    return registration
 
-    upcoming_events = await registration_model.get_events_by_volunteer(
-        volunteer_id, RegistrationStatus.UPCOMING
-    )
-    volunteer_signed_up = any(event.id == event.id for event in upcoming_events)
 
-    if not volunteer_signed_up:
+@router.post("/{event_id}/bulk-scan", response_model=list[ScanResult])
+async def bulk_scan_registrations(
+    event_id: str,
+    scans: Annotated[BulkScanRequest, Body(...)],
+    current_user: Annotated[User, Depends(get_current_user)],
+) -> list[ScanResult]:
+    if current_user.user_type not in [UserType.ORGANIZATION, UserType.ADMIN]:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Volunteer did not sign up for this event"
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only organizations can submit scans for an event",
         )
 
-    event = await event_model.get_event_by_id(event_id)
-    registration = await registration_model.check_out_registration(volunteer_id, event_id)
-    await volunteer_service.handle_volunteer_checkout_rewards(
-        registration, volunteer_id, event, volunteer
-    )
-
-    return registration
+    return await registration_service.apply_bulk_scans(event_id, scans, current_user)
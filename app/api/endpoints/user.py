@@ -5,7 +5,7 @@ from datetime import UTC, datetime, timedelta
 from typing import Annotated
 
 from bson import ObjectId
-from fastapi import APIRouter, Body, Depends, HTTPException, Request, status
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, status
 from fastapi.security import (
     HTTPAuthorizationCredentials,
     HTTPBearer,
@@ -16,6 +16,7 @@ from jose import JWTError, jwt
 
 from app.models.user import user_model
 from app.schemas.device_token import UnregisterDeviceTokenRequest
+from app.schemas.pagination import Page
 from app.schemas.user import (
     CreateUserRequest,
     LoginRequest,
@@ -25,8 +26,9 @@ from app.schemas.user import (
     UserResponse,
     UserType,
 )
-from app.services.cache import cache_service
 from app.services.device_token import device_token_service
+from app.services.token_blacklist import token_blacklist_service
+from app.utils.streaming import get_stream_format, stream_models
 from app.utils.user import create_access_token, hash_password, settings, verify_password
 
 router = APIRouter()
@@ -101,8 +103,7 @@ async def get_current_user(
 
     # check if token is blacklisted
     token_hash = hashlib.sha256(token.encode()).hexdigest()
-    is_blacklisted = await cache_service.get("blacklist:token", token_hash)
-    if is_blacklisted:
+    if await token_blacklist_service.is_revoked(token_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Token is blacklisted",
@@ -165,7 +166,7 @@ async def create_user(payload: Annotated[CreateUserRequest, Body(...)]):
 
     # Create user document
     user_id = str(ObjectId())
-    hashed_password = hash_password(payload.password)
+    hashed_password = await hash_password(payload.password)
 
     # Create user data dictionary
     user_data = {
@@ -222,7 +223,7 @@ async def login_for_access_token(payload: Annotated[LoginRequest, Body(...)]):
         )
 
     # Verify password
-    if not verify_password(payload.password, user.hashed_password):
+    if not await verify_password(payload.password, user.hashed_password):
         logger.error("Invalid password")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -252,7 +253,7 @@ async def oauth_scheme_token(form_data: Annotated[OAuth2PasswordRequestForm, Dep
     Returns only the token payload for OAuth2 compatibility.
     """
     user = await user_model.get_by_username(form_data.username.lower())
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if not user or not await verify_password(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -271,7 +272,7 @@ async def reset_password(
 ):
     """Reset password for the authenticated user."""
     # Verify current password
-    if not current_user.hashed_password or not verify_password(
+    if not current_user.hashed_password or not await verify_password(
         payload.current_password, current_user.hashed_password
     ):
         raise HTTPException(
@@ -284,14 +285,14 @@ async def reset_password(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=message)
 
     # Prevent reusing the same password
-    if verify_password(payload.new_password, current_user.hashed_password):
+    if await verify_password(payload.new_password, current_user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="New password must be different from the current password",
         )
 
     # Hash and update
-    new_hashed = hash_password(payload.new_password)
+    new_hashed = await hash_password(payload.new_password)
     try:
         await user_model.update_password_by_id(current_user.id, new_hashed)
     except Exception:
@@ -326,13 +327,7 @@ async def logout(
 
                 if remaining_seconds > 0:
                     token_hash = hashlib.sha256(token.encode()).hexdigest()
-                    # Store a simple marker value (string) to avoid Redis serialization errors
-                    await cache_service.set(
-                        "blacklist:token",
-                        token_hash,
-                        "1",
-                        expire=remaining_seconds,
-                    )
+                    await token_blacklist_service.revoke(token_hash, remaining_seconds)
         except (JWTError, ValueError) as e:
             logger.warning(f"Could not blacklist token: {e}")
 
@@ -347,11 +342,17 @@ async def read_users_me(current_user: Annotated[User, Depends(get_current_user)]
     return UserRedirectResponse(user_type=current_user.user_type, entity_id=current_user.entity_id)
 
 
-@router.get("/all", response_model=list[User])
-async def get_all_users():
+@router.get("/all", response_model=Page[User])
+async def get_all_users(
+    request: Request,
+    page: Annotated[int, Query(ge=1)] = 1,
+    limit: Annotated[int, Query(ge=1, le=200)] = 20,
+):
     """get all users"""
-    users = await user_model.get_all()
-    return users
+    if stream_format := get_stream_format(request):
+        return stream_models(user_model.iter_all(), stream_format)
+    users, total = await user_model.get_page(page, limit)
+    return Page(items=users, total=total, page=page, limit=limit)
 
 
 @router.get("/{user_id}", response_model=User)
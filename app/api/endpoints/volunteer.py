@@ -1,11 +1,13 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Body, Depends, HTTPException, status
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, status
 
 from app.api.endpoints.user import get_current_user
 from app.models.user import user_model
 from app.models.volunteer import volunteer_model
+from app.models.volunteer_organization_hours import volunteer_organization_hours_model
 from app.schemas.organization import Organization
+from app.schemas.pagination import Page
 from app.schemas.s3 import PresignedUrlResponse
 from app.schemas.user import User, UserType
 from app.schemas.volunteer import (
@@ -13,9 +15,12 @@ from app.schemas.volunteer import (
     TrainingDocument,
     UpdateVolunteerRequest,
     Volunteer,
+    VolunteerRankResponse,
 )
+from app.services.leaderboard import leaderboard_service
 from app.services.s3 import s3_service
 from app.services.volunteer import volunteer_service
+from app.utils.streaming import get_stream_format, stream_models
 from app.utils.user import verify_entity_association, verify_user_role
 
 router = APIRouter()
@@ -33,14 +38,33 @@ async def get_self(
     return volunteer
 
 
-@router.get("/all", response_model=list[Volunteer])
-async def get_volunteers() -> list[Volunteer]:
-    return await volunteer_model.get_all_volunteers()
+@router.get("/all", response_model=Page[Volunteer])
+async def get_volunteers(
+    request: Request,
+    page: Annotated[int, Query(ge=1)] = 1,
+    limit: Annotated[int, Query(ge=1, le=200)] = 20,
+) -> Page[Volunteer]:
+    if stream_format := get_stream_format(request):
+        return stream_models(volunteer_model.iter_all_volunteers(), stream_format)
+    volunteers, total = await volunteer_model.get_volunteers_page(page, limit)
+    return Page(items=volunteers, total=total, page=page, limit=limit)
 
 
 @router.get("/top", response_model=list[Volunteer])
 async def get_top_x_volunteers(limit: int = 10) -> list[Volunteer]:
-    return await volunteer_model.get_top_x_volunteers(limit)
+    return await leaderboard_service.get_top_volunteers(limit)
+
+
+@router.get("/me/rank", response_model=VolunteerRankResponse)
+async def get_my_rank(
+    current_user: Annotated[User, Depends(get_current_user)],
+) -> VolunteerRankResponse:
+    rank = await leaderboard_service.get_rank(current_user.entity_id)
+    if not rank:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Volunteer not on the leaderboard"
+        )
+    return rank
 
 
 @router.get("/level-progress")
@@ -76,7 +100,9 @@ async def get_top_organizations(
     verify_user_role(current_user, UserType.VOLUNTEER)
     verify_entity_association(current_user)
 
-    return await volunteer_model.get_top_organizations(current_user.entity_id, limit)
+    return await volunteer_organization_hours_model.get_top_organizations(
+        current_user.entity_id, limit
+    )
 
 
 @router.post("/new", response_model=Volunteer)
@@ -96,7 +122,9 @@ async def create_volunteer(
             detail="You have already been associated with a volunteer",
         )
 
-    return await volunteer_model.create_volunteer(volunteer, current_user.id)
+    created_volunteer = await volunteer_model.create_volunteer(volunteer, current_user.id)
+    await leaderboard_service.add_volunteer(created_volunteer.id)
+    return created_volunteer
 
 
 @router.put("/{volunteer_id}", response_model=Volunteer)
@@ -117,7 +145,14 @@ async def update_volunteer(
             detail="You do not have permission to update this volunteer",
         )
 
-    return await volunteer_model.update_volunteer(volunteer_id, volunteer)
+    updated_volunteer = await volunteer_model.update_volunteer(volunteer_id, volunteer)
+    if not updated_volunteer:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Volunteer not found")
+    if not updated_volunteer.is_active:
+        await leaderboard_service.remove_volunteer(updated_volunteer.id)
+    elif volunteer.experience is not None or volunteer.is_active:
+        await leaderboard_service.set_experience(updated_volunteer.id, updated_volunteer.experience)
+    return updated_volunteer
 
 
 @router.delete("/{volunteer_id}", response_model=None)
@@ -137,7 +172,8 @@ async def delete_volunteer(
             detail="You do not have permission to update this volunteer",
         )
 
-    return await volunteer_model.delete_volunteer(volunteer_id)
+    await volunteer_model.delete_volunteer(volunteer_id)
+    await leaderboard_service.remove_volunteer(volunteer_id)
 
 
 @router.get("/me/profile-picture/upload-url", response_model=PresignedUrlResponse)
@@ -1,2 +1,26 @@
 ACHIEVEMENT_IMAGES_NAMESPACE = "achievement_images"
 VOLUNTEER_RECEIVED_ACHIEVEMENTS_NAMESPACE = "volunteer_received_achievements"
+TOKEN_BLACKLIST_NAMESPACE = "blacklist:token"
+TOKEN_BLACKLIST_CHANNEL = "blacklist:token:revoked"
+QR_TOKEN_VERSION_NAMESPACE = "qr_token_version:event"
+QR_TOKEN_VERSION_TTL_SECONDS = 60
+EVENT_GEO_QUERY_NAMESPACE = "geo_query:event"
+ITEM_GEO_QUERY_NAMESPACE = "geo_query:item"
+ORGANIZATION_GEO_QUERY_NAMESPACE = "geo_query:organization"
+
+# Namespaces whose keys embed a generation number; bumping it invalidates the whole namespace
+VERSIONED_NAMESPACES = frozenset(
+    {
+        VOLUNTEER_RECEIVED_ACHIEVEMENTS_NAMESPACE,
+        EVENT_GEO_QUERY_NAMESPACE,
+        ITEM_GEO_QUERY_NAMESPACE,
+        ORGANIZATION_GEO_QUERY_NAMESPACE,
+    }
+)
+CACHE_GENERATION_NAMESPACE = "cache_generation"
+
+# Namespaces also cached in each worker's memory, mapped to the local TTL in seconds. Other
+# workers may serve a value up to this long after it was invalidated elsewhere
+LOCAL_CACHE_TTLS = {VOLUNTEER_RECEIVED_ACHIEVEMENTS_NAMESPACE: 5, QR_TOKEN_VERSION_NAMESPACE: 5}
+VOLUNTEER_LEADERBOARD_KEY = "leaderboard:volunteer_experience"
+MAP_CLUSTERS_NAMESPACE = "map_clusters"
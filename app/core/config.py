@@ -8,6 +8,8 @@ class Settings(BaseSettings):
     DATABASE_NAME: str
     SECRET_KEY: str = "karp"
     ALGORITHM: str = "HS256"
+    # Secrets that were rotated out but still verify QR codes printed before the rotation
+    QR_TOKEN_PREVIOUS_SECRET_KEYS: list[str] = []
     ACCESS_TOKEN_EXPIRE_MINUTES: int
     GOOGLE_MAPS_KEY: str
     AWS_S3_BUCKET_NAME: str
@@ -16,6 +18,13 @@ class Settings(BaseSettings):
     AWS_REGION: str
     REDIS_URL: str
     OPENAI_API_KEY: str
+    PASSWORD_HASHING_MAX_WORKERS: int = 4
+    LOCAL_CACHE_MAX_ENTRIES: int = 2048
+    # Geohash length location queries are snapped to for caching (6 is roughly 1.2 x 0.6 km)
+    GEO_CACHE_PRECISION: int = 6
+    # Batch geocoding limits; Google's default quota is 50 requests per second
+    GEOCODING_MAX_CONCURRENCY: int = 10
+    GEOCODING_MAX_QPS: float = 40
 
     class Config:
         env_file = ".env"
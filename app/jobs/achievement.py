@@ -0,0 +1,60 @@
+import logging
+
+from app.core.cache_constants import VOLUNTEER_RECEIVED_ACHIEVEMENTS_NAMESPACE
+from app.models.achievement import achievement_model
+from app.models.volunteer_achievement import volunteer_achievement_model
+from app.schemas.achievement import Achievement
+from app.services.cache import cache_service
+from app.services.scheduler import scheduler_service
+
+logger = logging.getLogger(__name__)
+
+# Writes refresh the catalog in the worker that made them; other workers pick them up here
+ACHIEVEMENT_CATALOG_REFRESH_SECONDS = 60
+
+
+def _get_achievement_backfill_job_key(achievement_id: str) -> str:
+    return f"achievement-backfill-{achievement_id}"
+
+
+async def schedule_achievement_backfill(achievement: Achievement) -> None:
+    if not achievement.is_active:
+        return
+
+    scheduler = scheduler_service.get_scheduler()
+    scheduler.add_job(
+        id=_get_achievement_backfill_job_key(achievement.id),
+        func=_backfill_achievement,
+        args=[achievement],
+        replace_existing=True,
+    )
+    logger.info(f"Scheduled backfill for achievement {achievement.name}")
+
+
+async def _backfill_achievement(achievement: Achievement) -> None:
+    try:
+        granted_volunteer_ids = await volunteer_achievement_model.backfill_achievement(
+            achievement.id, achievement.event_type, achievement.threshold
+        )
+    except Exception as e:
+        logger.error(f"Error backfilling achievement {achievement.id}: {e}")
+        return
+
+    # Only the volunteers who just received it have a stale cached list
+    await cache_service.delete_many(
+        VOLUNTEER_RECEIVED_ACHIEVEMENTS_NAMESPACE, granted_volunteer_ids
+    )
+    logger.info(
+        f"Backfilled achievement {achievement.name} to {len(granted_volunteer_ids)} volunteers"
+    )
+
+
+def schedule_achievement_catalog_refresh() -> None:
+    scheduler = scheduler_service.get_scheduler()
+    scheduler.add_job(
+        id="achievement-catalog-refresh",
+        func=achievement_model.refresh_catalog,
+        trigger="interval",
+        seconds=ACHIEVEMENT_CATALOG_REFRESH_SECONDS,
+        replace_existing=True,
+    )
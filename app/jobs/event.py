@@ -10,6 +10,11 @@ from app.services.scheduler import scheduler_service
 
 logger = logging.getLogger(__name__)
 
+# registered_count is kept up to date on every registration; this only catches drift
+REGISTERED_COUNT_RECONCILE_HOURS = 1
+# Writes update the spatial index in the worker that made them; other workers pick them up here
+EVENT_SPATIAL_INDEX_REFRESH_SECONDS = 60
+
 
 def format_time_delta(time_delta: timedelta) -> str:
     total_seconds = int(time_delta.total_seconds())
@@ -105,3 +110,38 @@ async def cancel_event_notifications(event: Event) -> None:
         scheduler_service.get_scheduler().remove_job(
             _get_event_notification_job_key(event.id, timedelta(days=1))
         )
+
+
+def schedule_event_spatial_index_refresh() -> None:
+    scheduler = scheduler_service.get_scheduler()
+    scheduler.add_job(
+        id="event-spatial-index-refresh",
+        func=event_model.refresh_spatial_index,
+        trigger="interval",
+        seconds=EVENT_SPATIAL_INDEX_REFRESH_SECONDS,
+        replace_existing=True,
+    )
+
+
+def schedule_registered_count_reconciliation() -> None:
+    scheduler = scheduler_service.get_scheduler()
+    scheduler.add_job(
+        id="event-registered-count-reconciliation",
+        func=_reconcile_registered_counts,
+        trigger="interval",
+        hours=REGISTERED_COUNT_RECONCILE_HOURS,
+        next_run_time=datetime.now(UTC),
+        replace_existing=True,
+    )
+
+
+async def _reconcile_registered_counts() -> None:
+    try:
+        raised, too_high = await event_model.reconcile_registered_counts()
+        logger.info(f"Reconciled event registered counts, raised {raised}")
+        if too_high:
+            logger.warning(
+                f"registered_count is higher than the active registrations for events {too_high}"
+            )
+    except Exception as e:
+        logger.error(f"Error reconciling event registered counts: {e}")
@@ -0,0 +1,29 @@
+import logging
+from datetime import UTC, datetime
+
+from app.services.leaderboard import leaderboard_service
+from app.services.scheduler import scheduler_service
+
+logger = logging.getLogger(__name__)
+
+# Incremental updates keep the board current; the rebuild catches anything they missed
+LEADERBOARD_REBUILD_HOURS = 6
+
+
+def schedule_leaderboard_rebuild() -> None:
+    scheduler = scheduler_service.get_scheduler()
+    scheduler.add_job(
+        id="volunteer-leaderboard-rebuild",
+        func=_rebuild_leaderboard,
+        trigger="interval",
+        hours=LEADERBOARD_REBUILD_HOURS,
+        next_run_time=datetime.now(UTC),
+        replace_existing=True,
+    )
+
+
+async def _rebuild_leaderboard() -> None:
+    try:
+        await leaderboard_service.rebuild()
+    except Exception as e:
+        logger.error(f"Error rebuilding volunteer leaderboard: {e}")
@@ -0,0 +1,30 @@
+import logging
+from datetime import UTC, datetime
+
+from app.models.volunteer_organization_hours import volunteer_organization_hours_model
+from app.services.scheduler import scheduler_service
+
+logger = logging.getLogger(__name__)
+
+# Checkouts update the rollup incrementally; the rebuild corrects any drift
+VOLUNTEER_ORGANIZATION_HOURS_REBUILD_HOURS = 24
+
+
+def schedule_volunteer_organization_hours_rebuild() -> None:
+    scheduler = scheduler_service.get_scheduler()
+    scheduler.add_job(
+        id="volunteer-organization-hours-rebuild",
+        func=_rebuild_volunteer_organization_hours,
+        trigger="interval",
+        hours=VOLUNTEER_ORGANIZATION_HOURS_REBUILD_HOURS,
+        next_run_time=datetime.now(UTC),
+        replace_existing=True,
+    )
+
+
+async def _rebuild_volunteer_organization_hours() -> None:
+    try:
+        await volunteer_organization_hours_model.rebuild()
+        logger.info("Rebuilt volunteer organization hours")
+    except Exception as e:
+        logger.error(f"Error rebuilding volunteer organization hours: {e}")
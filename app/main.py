@@ -25,14 +25,26 @@ from app.api.endpoints import (
     volunteer_achievement,
 )
 from app.core.config import settings
+from app.jobs.achievement import schedule_achievement_catalog_refresh
+from app.jobs.event import (
+    schedule_event_spatial_index_refresh,
+    schedule_registered_count_reconciliation,
+)
+from app.jobs.leaderboard import schedule_leaderboard_rebuild
+from app.jobs.volunteer_organization_hours import schedule_volunteer_organization_hours_rebuild
+from app.models.achievement import achievement_model
 from app.models.event import EventModel
 from app.models.event_similarity import EventSimilarityModel
 from app.models.item import ItemModel
+from app.models.order import OrderModel
 from app.models.organization import OrganizationModel
 from app.models.registration import RegistrationModel
 from app.models.vendor import VendorModel
 from app.models.volunteer import VolunteerModel
+from app.models.volunteer_achievement import VolunteerAchievementModel
+from app.models.volunteer_organization_hours import VolunteerOrganizationHoursModel
 from app.services.scheduler import scheduler_service
+from app.services.token_blacklist import token_blacklist_service
 
 
 @asynccontextmanager
@@ -42,16 +54,27 @@ async def lifespan(app: FastAPI):
     org_model = OrganizationModel.get_instance()
     event_similarity_model = EventSimilarityModel.get_instance()
     item_model = ItemModel.get_instance()
+    order_model = OrderModel.get_instance()
     registration_model = RegistrationModel.get_instance()
     vendor_model = VendorModel.get_instance()
     volunteer_model = VolunteerModel.get_instance()
+    volunteer_achievement_model = VolunteerAchievementModel.get_instance()
+    volunteer_organization_hours_model = VolunteerOrganizationHoursModel.get_instance()
     await event_model.create_indexes()
     await org_model.create_indexes()
     await event_similarity_model.create_indexes()
     await item_model.create_indexes()
+    await order_model.create_indexes()
     await registration_model.create_indexes()
     await vendor_model.create_indexes()
     await volunteer_model.create_indexes()
+    await volunteer_achievement_model.create_indexes()
+    await volunteer_organization_hours_model.create_indexes()
+
+    # Load the active achievement catalog used for threshold lookups
+    await achievement_model.refresh_catalog()
+    # Load event coordinates used to answer radius queries in memory
+    await event_model.refresh_spatial_index()
 
     # Initialize cache
     redis_backend = RedisBackend(Redis.from_url(settings.REDIS_URL))
@@ -61,11 +84,20 @@ async def lifespan(app: FastAPI):
         redis_backend,
     )
 
+    # Load revoked tokens and subscribe to logouts from other workers
+    await token_blacklist_service.start()
+
     # Initialize and start scheduler
     scheduler_service.start()
+    schedule_achievement_catalog_refresh()
+    schedule_event_spatial_index_refresh()
+    schedule_leaderboard_rebuild()
+    schedule_volunteer_organization_hours_rebuild()
+    schedule_registered_count_reconciliation()
     yield
     # Shutdown scheduler
     scheduler_service.shutdown()
+    await token_blacklist_service.stop()
 
 
 app = FastAPI(lifespan=lifespan, debug=True)
@@ -74,6 +106,10 @@ app = FastAPI(lifespan=lifespan, debug=True)
 class NoCacheMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next):
         response = await call_next(request)
+        if "etag" in response.headers:
+            # Clients may keep it but must revalidate with If-None-Match on every use
+            response.headers["Cache-Control"] = "no-cache"
+            return response
         response.headers["Cache-Control"] = "no-cache, no-store, must-revalidate"
         response.headers["Pragma"] = "no-cache"
         response.headers["Expires"] = "0"
@@ -1,3 +1,7 @@
+import hashlib
+import logging
+from bisect import bisect_left, bisect_right
+
 from fastapi import HTTPException
 
 from app.database.mongodb import db
@@ -5,6 +9,40 @@ from app.schemas.achievement import Achievement, CreateAchievementRequest, Updat
 from app.schemas.karp_event import KarpEvent
 from app.utils.object_id import parse_object_id
 
+logger = logging.getLogger(__name__)
+
+
+class AchievementCatalog:
+    """
+    Immutable snapshot of the active achievements, sorted by (event_type, threshold) so
+    threshold ranges for an event type can be found with bisect.
+    """
+
+    def __init__(self, achievements: list[Achievement]):
+        self.achievements = sorted(
+            achievements, key=lambda a: (a.event_type.value, a.threshold, a.id)
+        )
+        self._keys = [(a.event_type.value, a.threshold) for a in self.achievements]
+        digest = hashlib.sha256()
+        for achievement in self.achievements:
+            digest.update(achievement.model_dump_json().encode())
+        self.etag = f'"{digest.hexdigest()[:32]}"'
+
+    def find(
+        self,
+        event_type: KarpEvent | None = None,
+        threshold_min: int | None = None,
+        threshold_max: int | None = None,
+    ) -> list[Achievement]:
+        low = threshold_min if threshold_min is not None else float("-inf")
+        high = threshold_max if threshold_max is not None else float("inf")
+        if event_type is None:
+            return [a for a in self.achievements if low <= a.threshold <= high]
+
+        start = bisect_left(self._keys, (event_type.value, low))
+        end = bisect_right(self._keys, (event_type.value, high))
+        return self.achievements[start:end]
+
 
 class AchievementModel:
     _instance: "AchievementModel" = None
@@ -13,6 +51,7 @@ class AchievementModel:
         if AchievementModel._instance is not None:
             raise Exception("This class is a singleton!")
         self.collection = db["achievements"]
+        self.catalog: AchievementCatalog | None = None
 
     @classmethod
     def get_instance(cls) -> "AchievementModel":
@@ -20,9 +59,19 @@ class AchievementModel:
             AchievementModel._instance = cls()
         return AchievementModel._instance
 
+    async def refresh_catalog(self) -> None:
+        try:
+            achievements_list = await self.collection.find({"is_active": True}).to_list(length=None)
+            self.catalog = AchievementCatalog(
+                [Achievement(**achievement) for achievement in achievements_list]
+            )
+        except Exception as e:
+            logger.error(f"Error refreshing achievement catalog: {e}")
+
     async def create_achievement(self, achievement: CreateAchievementRequest) -> Achievement:
         achievement_data = achievement.model_dump()
         result = await self.collection.insert_one(achievement_data)
+        await self.refresh_catalog()
 
         achievement_data["_id"] = result.inserted_id
 
@@ -34,6 +83,9 @@ class AchievementModel:
         threshold_min: int | None = None,
         threshold_max: int | None = None,
     ) -> list[Achievement]:
+        if self.catalog is not None:
+            return self.catalog.find(event_type, threshold_min, threshold_max)
+
         filters = {"is_active": True}
         if event_type is not None:
             filters["event_type"] = event_type
@@ -63,6 +115,7 @@ class AchievementModel:
         await self.collection.update_one(
             {"_id": achievement_obj_id}, {"$set": {"is_active": False}}
         )
+        await self.refresh_catalog()
 
     async def activate_achievement(self, achievement_id: str) -> None:
         achievement_obj_id = parse_object_id(achievement_id)
@@ -72,6 +125,7 @@ class AchievementModel:
 
         if result.matched_count == 0:
             raise HTTPException(status_code=404, detail="Achievement not found")
+        await self.refresh_catalog()
 
     async def update_achievement(
         self, updated_achievement: UpdateAchievementRequest, achievement_id: str
@@ -86,6 +140,7 @@ class AchievementModel:
 
         if result.matched_count == 0:
             raise HTTPException(status_code=404, detail="Achievement not found")
+        await self.refresh_catalog()
 
     async def delete_achievement(self, achievement_id: str) -> None:
         achievement_obj_id = parse_object_id(achievement_id)
@@ -94,6 +149,7 @@ class AchievementModel:
 
         if result.deleted_count == 0:
             raise HTTPException(status_code=404, detail="Achievement not found")
+        await self.refresh_catalog()
 
     async def update_achievement_image(self, achievement_id: str, s3_key: str) -> str:
         achievement_obj_id = parse_object_id(achievement_id)
@@ -102,6 +158,7 @@ class AchievementModel:
         )
         if result.matched_count == 0:
             raise HTTPException(status_code=404, detail="Achievement not found")
+        await self.refresh_catalog()
         return s3_key
 
 
@@ -1,20 +1,115 @@
+import logging
 import re
 from datetime import UTC, datetime, timedelta
 from typing import TYPE_CHECKING, Literal
 
+import numpy as np
 from bson import ObjectId
 from fastapi import HTTPException
+from pymongo import ReturnDocument, UpdateOne
 
+from app.core.cache_constants import EVENT_GEO_QUERY_NAMESPACE
 from app.database.mongodb import db
 from app.models.volunteer import volunteer_model
-from app.schemas.event import CreateEventRequest, Event, EventStatus, UpdateEventRequest
+from app.schemas.event import (
+    CreateEventRequest,
+    Event,
+    EventFacetPage,
+    EventFacets,
+    EventStatus,
+    FacetCount,
+    UpdateEventRequest,
+)
 from app.schemas.location import Location
 from app.schemas.registration import RegistrationStatus
 from app.schemas.volunteer import Volunteer
+from app.utils.geo_cache import find_near_cached, invalidate_near_cache, sort_documents
+from app.utils.map_tiles import cluster_tile
+from app.utils.pagination import paginate
+from app.utils.qr_token import REVOKED_QR_TOKEN_VERSION
 
 if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
     from motor.motor_asyncio import AsyncIOMotorCollection
 
+QR_CODE_FIELDS = (
+    "check_in_qr_code_image",
+    "check_in_qr_token",
+    "check_out_qr_code_image",
+    "check_out_qr_token",
+)
+
+# Day names as numbered by Mongo's $dayOfWeek
+DAY_NAME_TO_MONGO = {
+    "Sunday": 1,
+    "Monday": 2,
+    "Tuesday": 3,
+    "Wednesday": 4,
+    "Thursday": 5,
+    "Friday": 6,
+    "Saturday": 7,
+}
+MONGO_TO_DAY_NAME = {number: day for day, number in DAY_NAME_TO_MONGO.items()}
+
+# Same sphere as Mongo's 2dsphere distance calculations
+EARTH_RADIUS_METERS = 6378100.0
+# Above this many events in the radius the _id lookup gets too large, use $geoNear instead
+MAX_NEARBY_CANDIDATES = 2000
+
+logger = logging.getLogger(__name__)
+
+
+class EventSpatialIndex:
+    """
+    Coordinates of every event with a location, held as NumPy arrays so radius queries are
+    a single vectorized haversine pass. Only ids and coordinates are kept; callers still
+    apply their other filters in Mongo with an _id lookup.
+    """
+
+    def __init__(self, coordinates: dict[str, tuple[float, float]]):
+        self._ids: list[str] = list(coordinates)
+        self._positions = {event_id: i for i, event_id in enumerate(self._ids)}
+        lng_lat = np.radians(np.array(list(coordinates.values()), dtype=float).reshape(-1, 2))
+        self._lng = lng_lat[:, 0].copy()
+        self._lat = lng_lat[:, 1].copy()
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def upsert(self, event_id: str, lng: float, lat: float) -> None:
+        position = self._positions.get(event_id)
+        if position is None:
+            self._positions[event_id] = len(self._ids)
+            self._ids.append(event_id)
+            self._lng = np.append(self._lng, np.radians(lng))
+            self._lat = np.append(self._lat, np.radians(lat))
+        else:
+            self._lng[position] = np.radians(lng)
+            self._lat[position] = np.radians(lat)
+
+    def remove(self, event_id: str) -> None:
+        position = self._positions.pop(event_id, None)
+        if position is not None:
+            # NaN never compares within a radius; the slot is dropped on the next refresh
+            self._lng[position] = np.nan
+            self._lat[position] = np.nan
+
+    def within(self, lng: float, lat: float, max_distance_meters: float) -> dict[str, float]:
+        """
+        Return event id -> distance in meters for every event within the radius, nearest
+        first.
+        """
+        lng1, lat1 = np.radians(lng), np.radians(lat)
+        a = (
+            np.sin((self._lat - lat1) / 2) ** 2
+            + np.cos(lat1) * np.cos(self._lat) * np.sin((self._lng - lng1) / 2) ** 2
+        )
+        distances = 2 * EARTH_RADIUS_METERS * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+        matches = np.flatnonzero(distances <= max_distance_meters)
+        ordered = matches[np.argsort(distances[matches], kind="stable")]
+        return {self._ids[i]: float(distances[i]) for i in ordered}
+
 
 class EventModel:
     _instance: "EventModel" = None
@@ -23,6 +118,7 @@ class EventModel:
         if EventModel._instance is not None:
             raise Exception("This class is a singleton!")
         self.collection: AsyncIOMotorCollection = db["events"]
+        self.spatial_index: EventSpatialIndex | None = None
 
         self.manual_difficulty_coefficient_coefficient = 0.2
 
@@ -36,9 +132,172 @@ class EventModel:
         try:
             await self.collection.create_index([("location", "2dsphere")])
             await self.collection.create_index("tags")
+            await self.collection.create_index(
+                [("organization_id", 1), ("start_date_time", -1), ("_id", -1)]
+            )
         except Exception:
             pass
 
+    async def refresh_spatial_index(self) -> None:
+        try:
+            coordinates: dict[str, tuple[float, float]] = {}
+            cursor = self.collection.find(
+                {"location.coordinates": {"$exists": True}}, {"location.coordinates": 1}
+            )
+            async for event in cursor:
+                lng, lat = event["location"]["coordinates"][:2]
+                coordinates[str(event["_id"])] = (lng, lat)
+            self.spatial_index = EventSpatialIndex(coordinates)
+        except Exception as e:
+            logger.error(f"Error refreshing event spatial index: {e}")
+
+    def _index_location(self, event_id: str, location: dict | None) -> None:
+        if self.spatial_index is None:
+            return
+        if location and location.get("coordinates"):
+            lng, lat = location["coordinates"][:2]
+            self.spatial_index.upsert(event_id, lng, lat)
+        else:
+            self.spatial_index.remove(event_id)
+
+    async def _find_nearby(
+        self,
+        filters: dict,
+        lng: float,
+        lat: float,
+        max_distance_meters: float,
+        sort_field: str,
+        direction: int,
+        skip: int = 0,
+        limit: int | None = None,
+    ) -> list[dict] | None:
+        """
+        Answer a $geoNear-style query from the spatial index, with Mongo only applying the
+        other filters to the ids in range. Returns None when the index can't serve the
+        query and the caller should fall back to $geoNear.
+        """
+        if self.spatial_index is None:
+            return None
+        nearby = self.spatial_index.within(lng, lat, max_distance_meters)
+        if not nearby:
+            return []
+        if len(nearby) > MAX_NEARBY_CANDIDATES:
+            return None
+
+        id_filter = {"_id": {"$in": [ObjectId(event_id) for event_id in nearby]}}
+        query = {"$and": [filters, id_filter]} if filters else id_filter
+
+        if sort_field != "distance":
+            cursor = self.collection.find(query).sort([(sort_field, direction), ("_id", 1)])
+            cursor = cursor.skip(skip)
+            if limit is not None:
+                cursor = cursor.limit(limit)
+            return await cursor.to_list(length=None)
+
+        # Order the matching ids by distance, then load only the requested page
+        matching = await self.collection.find(query, {"_id": 1}).to_list(length=None)
+        ordered = sorted(
+            (str(doc["_id"]) for doc in matching),
+            key=lambda event_id: (direction * nearby[event_id], event_id),
+        )
+        page_ids = ordered[skip : skip + limit] if limit is not None else ordered[skip:]
+        docs = await self.collection.find(
+            {"_id": {"$in": [ObjectId(event_id) for event_id in page_ids]}}
+        ).to_list(length=None)
+        docs_by_id = {str(doc["_id"]): doc for doc in docs}
+        return [docs_by_id[event_id] for event_id in page_ids if event_id in docs_by_id]
+
+    async def reserve_spot(self, event_id: str) -> bool:
+        # Check capacity and take the spot in one write so concurrent registrations can't
+        # overbook the event
+        result = await self.collection.update_one(
+            {
+                "_id": ObjectId(event_id),
+                "$expr": {"$lt": [{"$ifNull": ["$registered_count", 0]}, "$max_volunteers"]},
+            },
+            {"$inc": {"registered_count": 1}},
+        )
+        if result.modified_count != 1:
+            return False
+        await invalidate_near_cache(EVENT_GEO_QUERY_NAMESPACE)
+        return True
+
+    async def release_spot(self, event_id: str) -> None:
+        await self.collection.update_one(
+            {"_id": ObjectId(event_id), "registered_count": {"$gt": 0}},
+            {"$inc": {"registered_count": -1}},
+        )
+        await invalidate_near_cache(EVENT_GEO_QUERY_NAMESPACE)
+
+    async def reconcile_registered_counts(self) -> tuple[int, list[str]]:
+        """
+        Recount active registrations for events that haven't ended. Counts that are too low
+        are raised, but only where registered_count hasn't changed since it was read.
+
+        Counts that are too high are not lowered. A registration reserves its spot before
+        it is inserted, so a recount taken between the two is briefly one short, and
+        writing it back could let the event overbook. Those event ids are returned so the
+        drift can be reported instead.
+        """
+        pipeline = [
+            {
+                "$match": {
+                    "status": {"$ne": EventStatus.CANCELLED},
+                    # Older documents store the dates as ISO strings
+                    "$expr": {"$gt": [{"$toDate": "$end_date_time"}, datetime.now(UTC)]},
+                }
+            },
+            {"$project": {"registered_count": {"$ifNull": ["$registered_count", 0]}}},
+            {
+                "$lookup": {
+                    "from": "registrations",
+                    "let": {"event_id": "$_id"},
+                    "pipeline": [
+                        {
+                            "$match": {
+                                "$expr": {"$eq": ["$event_id", "$$event_id"]},
+                                "registration_status": {"$ne": RegistrationStatus.UNREGISTERED},
+                            }
+                        },
+                        {"$count": "count"},
+                    ],
+                    "as": "active",
+                }
+            },
+            {
+                "$project": {
+                    "registered_count": 1,
+                    "active_count": {"$ifNull": [{"$first": "$active.count"}, 0]},
+                }
+            },
+            {"$match": {"$expr": {"$ne": ["$registered_count", "$active_count"]}}},
+        ]
+        drifted = await self.collection.aggregate(pipeline).to_list(length=None)
+
+        raises = [
+            UpdateOne(
+                # Skip the event if a registration changed its count since the read
+                {
+                    "_id": doc["_id"],
+                    "registered_count": (
+                        doc["registered_count"] if doc["registered_count"] else {"$in": [0, None]}
+                    ),
+                },
+                {"$set": {"registered_count": doc["active_count"]}},
+            )
+            for doc in drifted
+            if doc["active_count"] > doc["registered_count"]
+        ]
+        raised = 0
+        if raises:
+            result = await self.collection.bulk_write(raises, ordered=False)
+            raised = result.modified_count
+            await invalidate_near_cache(EVENT_GEO_QUERY_NAMESPACE)
+        too_high = [
+            str(doc["_id"]) for doc in drifted if doc["active_count"] < doc["registered_count"]
+        ]
+        return raised, too_high
+
     async def create_event(
         self,
         event: CreateEventRequest,
@@ -78,6 +337,8 @@ class EventModel:
         )
         event_data["_id"] = result.inserted_id
         inserted_doc = await self.collection.find_one({"_id": result.inserted_id})
+        self._index_location(str(result.inserted_id), inserted_doc.get("location"))
+        await invalidate_near_cache(EVENT_GEO_QUERY_NAMESPACE)
         return Event(**inserted_doc)
 
     async def get_all_events(
@@ -113,7 +374,8 @@ class EventModel:
         lat: float | None = None,
         lng: float | None = None,
         volunteer_event_ids: set[str] | None = None,
-    ) -> list[Event]:
+        include_facets: bool = False,
+    ) -> list[Event] | EventFacetPage:
         filters: dict = {}
         if statuses:
             filters_status = {"status": {"$in": list(statuses)}}
@@ -210,17 +472,8 @@ class EventModel:
 
         # Apply availability filtering
         if availability_days:
-            day_name_to_mongo = {
-                "Sunday": 1,
-                "Monday": 2,
-                "Tuesday": 3,
-                "Wednesday": 4,
-                "Thursday": 5,
-                "Friday": 6,
-                "Saturday": 7,
-            }
             mongo_weekdays = [
-                day_name_to_mongo[day] for day in availability_days if day in day_name_to_mongo
+                DAY_NAME_TO_MONGO[day] for day in availability_days if day in DAY_NAME_TO_MONGO
             ]
 
             expr_conditions = []
@@ -322,10 +575,33 @@ class EventModel:
                     }
                 }
                 pipeline.append(geo_near_stage)
-                docs = await self.collection.aggregate(pipeline).to_list(length=None)
             else:
-                cursor = self.collection.find(filters or {})
-                docs = await cursor.to_list(length=None)
+                pipeline = [{"$match": filters or {}}]
+
+            facet_result = None
+            if include_facets:
+                # Every match is loaded for the Python sort below, which could overflow a
+                # single $facet document, so only the counts are aggregated here
+                counts_pipeline = [*pipeline, self._facet_stage()]
+                facet_result = (await self.collection.aggregate(counts_pipeline).to_list(1))[0]
+
+            docs = None
+            if use_geo:
+                docs = await find_near_cached(
+                    EVENT_GEO_QUERY_NAMESPACE,
+                    self.collection,
+                    filters or {},
+                    lng,
+                    lat,
+                    max_distance_meters,
+                    exclude_fields=QR_CODE_FIELDS,
+                )
+                if docs is None:
+                    docs = await self._find_nearby(
+                        filters or {}, lng, lat, max_distance_meters, "distance", 1
+                    )
+            if docs is None:
+                docs = await self.collection.aggregate(pipeline).to_list(length=None)
 
             events = [Event(**d) for d in docs]
             been_before = [e for e in events if e.id in volunteer_event_ids]
@@ -336,6 +612,8 @@ class EventModel:
             skip = max(0, (page - 1) * max(1, limit))
             safe_limit = max(1, min(200, limit))
             events = events[skip : skip + safe_limit]
+            if facet_result is not None:
+                return self._to_facet_page(facet_result, events, page, limit)
             return events
 
         # For other sort types, use database-level sorting/pagination (matching search_events)
@@ -383,16 +661,46 @@ class EventModel:
             elif sort_by == "coins_high_to_low":
                 direction = -1
 
-            pipeline.append({"$sort": {mongo_sort_field: direction, "_id": 1}})
+            page_stages = [{"$sort": {mongo_sort_field: direction, "_id": 1}}]
 
             # Stage 3: Skip and limit
             skip = max(0, (page - 1) * max(1, limit))
             safe_limit = max(1, min(200, limit))
-            pipeline.append({"$skip": skip})
-            pipeline.append({"$limit": safe_limit})
-
-            # Execute aggregation
-            docs = await self.collection.aggregate(pipeline).to_list(length=None)
+            page_stages.append({"$skip": skip})
+            page_stages.append({"$limit": safe_limit})
+
+            if include_facets:
+                pipeline.append(self._facet_stage(page_stages))
+                facet_result = (await self.collection.aggregate(pipeline).to_list(length=1))[0]
+                events = [Event(**d) for d in facet_result["items"]]
+                return self._to_facet_page(facet_result, events, page, limit)
+
+            docs = await find_near_cached(
+                EVENT_GEO_QUERY_NAMESPACE,
+                self.collection,
+                filters or {},
+                lng,
+                lat,
+                max_distance_meters,
+                exclude_fields=QR_CODE_FIELDS,
+            )
+            if docs is not None:
+                docs = sort_documents(docs, mongo_sort_field, direction)[skip : skip + safe_limit]
+            else:
+                docs = await self._find_nearby(
+                    filters or {},
+                    lng,
+                    lat,
+                    max_distance_meters,
+                    mongo_sort_field,
+                    direction,
+                    skip,
+                    safe_limit,
+                )
+            if docs is None:
+                # Execute aggregation
+                pipeline.extend(page_stages)
+                docs = await self.collection.aggregate(pipeline).to_list(length=None)
         else:
             # No location filter - use regular find with database-level sort/pagination
             sort_field_map = {
@@ -417,6 +725,17 @@ class EventModel:
 
             skip = max(0, (page - 1) * max(1, limit))
             safe_limit = max(1, min(200, limit))
+            if include_facets:
+                # Sorting ahead of $facet lets the sort use an index
+                pipeline = [
+                    {"$match": filters or {}},
+                    {"$sort": {mongo_sort_field: direction, "_id": 1}},
+                    self._facet_stage([{"$skip": skip}, {"$limit": safe_limit}]),
+                ]
+                facet_result = (await self.collection.aggregate(pipeline).to_list(length=1))[0]
+                events = [Event(**d) for d in facet_result["items"]]
+                return self._to_facet_page(facet_result, events, page, limit)
+
             cursor = (
                 self.collection.find(filters or {})
                 .sort([(mongo_sort_field, direction), ("_id", 1)])
@@ -429,10 +748,55 @@ class EventModel:
 
         return events
 
+    def _facet_stage(self, page_stages: list[dict] | None = None) -> dict:
+        # Counts are taken over every match, before pagination. Without page stages only the
+        # counts are returned.
+        facets = {
+            "total": [{"$count": "count"}],
+            "keywords": [{"$unwind": "$keywords"}, {"$sortByCount": "$keywords"}],
+            # start_date_time is stored as an ISO string
+            "weekdays": [{"$sortByCount": {"$dayOfWeek": {"$toDate": "$start_date_time"}}}],
+            "statuses": [{"$sortByCount": "$status"}],
+        }
+        if page_stages is not None:
+            facets["items"] = page_stages
+        return {"$facet": facets}
+
+    def _to_facet_page(
+        self, facet_result: dict, events: list[Event], page: int, limit: int
+    ) -> EventFacetPage:
+        total = facet_result["total"][0]["count"] if facet_result["total"] else 0
+        facets = EventFacets(
+            keywords=[
+                FacetCount(value=bucket["_id"], count=bucket["count"])
+                for bucket in facet_result["keywords"]
+            ],
+            weekdays=[
+                FacetCount(value=MONGO_TO_DAY_NAME[bucket["_id"]], count=bucket["count"])
+                for bucket in facet_result["weekdays"]
+                if bucket["_id"] in MONGO_TO_DAY_NAME
+            ],
+            statuses=[
+                FacetCount(value=bucket["_id"], count=bucket["count"])
+                for bucket in facet_result["statuses"]
+            ],
+        )
+        return EventFacetPage(items=events, total=total, page=page, limit=limit, facets=facets)
+
+    async def get_map_clusters(self, x: int, y: int, zoom: int) -> list[dict]:
+        return await cluster_tile(self.collection, {"status": EventStatus.APPROVED}, x, y, zoom)
+
     async def get_events_by_location(self, distance: float, location: Location) -> list[Event]:
-        events_list = await self.collection.find(
-            {"location": {"$near": {"$geometry": location.model_dump(), "$maxDistance": distance}}}
-        ).to_list(length=None)
+        lng, lat = location.coordinates[:2]
+        events_list = await self._find_nearby({}, lng, lat, distance, "distance", 1)
+        if events_list is None:
+            events_list = await self.collection.find(
+                {
+                    "location": {
+                        "$near": {"$geometry": location.model_dump(), "$maxDistance": distance}
+                    }
+                }
+            ).to_list(length=None)
         return [Event(**event) for event in events_list]
 
     async def get_event_by_id(self, event_id: str) -> Event | None:
@@ -448,6 +812,25 @@ class EventModel:
         )
         return [Event(**event) for event in events_list]
 
+    async def get_events_by_organization_page(
+        self, organization_id: str, page: int, limit: int
+    ) -> tuple[list[Event], int]:
+        docs, total = await paginate(
+            self.collection,
+            {"organization_id": organization_id},
+            {"start_date_time": -1, "_id": -1},
+            page,
+            limit,
+        )
+        return [Event(**doc) for doc in docs], total
+
+    async def iter_events_by_organization(
+        self, organization_id: str, batch_size: int = 500
+    ) -> "AsyncIterator[Event]":
+        cursor = self.collection.find({"organization_id": organization_id}).batch_size(batch_size)
+        async for event in cursor:
+            yield Event(**event)
+
     async def update_event(
         self, event_id: str, event: UpdateEventRequest, location: Location | None = None
     ) -> Event | None:
@@ -459,8 +842,17 @@ class EventModel:
             # If address was provided and geocoded, update location
             if location:
                 updated_data["location"] = location.model_dump()
-            await self.collection.update_one({"_id": ObjectId(event_id)}, {"$set": updated_data})
+            update: dict = {"$set": updated_data}
+            if {"start_date_time", "end_date_time"} & updated_data.keys():
+                # QR tokens are signed over the old times, so revoke them and allow new ones
+                update["$inc"] = {"qr_token_version": 1}
+                update["$unset"] = {
+                    field: "" for field in QR_CODE_FIELDS if field not in updated_data
+                }
+            await self.collection.update_one({"_id": ObjectId(event_id)}, update)
             updated_event = await self.collection.find_one({"_id": ObjectId(event_id)})
+            self._index_location(event_id, updated_event.get("location"))
+            await invalidate_near_cache(EVENT_GEO_QUERY_NAMESPACE)
 
             # if event_data["status"] == Status.COMPLETED:
             #     await self.registration_service.update_not_checked_out_volunteers(event_id)
@@ -468,6 +860,36 @@ class EventModel:
             return Event(**updated_event)
         raise HTTPException(status_code=404, detail="No event with this ID was found")
 
+    async def store_qr_codes(
+        self, event_id: str, expected_version: int, qr_codes: dict[str, str]
+    ) -> Event | None:
+        """
+        Save freshly generated QR codes and move to the next token version, unless another
+        generation already did. Returns None if the version has moved on.
+        """
+        # Events created before versioning have no qr_token_version, which reads as 0
+        current_version = {"$in": [0, None]} if expected_version == 0 else expected_version
+        updated_doc = await self.collection.find_one_and_update(
+            {"_id": ObjectId(event_id), "qr_token_version": current_version},
+            {"$set": {**qr_codes, "qr_token_version": expected_version + 1}},
+            return_document=ReturnDocument.AFTER,
+        )
+        return Event(**updated_doc) if updated_doc else None
+
+    async def get_qr_token_version(self, event_id: str) -> int | None:
+        """
+        Version that signed QR tokens for the event must carry, REVOKED_QR_TOKEN_VERSION
+        once the event is cancelled, or None if there is no such event.
+        """
+        event = await self.collection.find_one(
+            {"_id": ObjectId(event_id)}, {"qr_token_version": 1, "status": 1}
+        )
+        if not event:
+            return None
+        if event.get("status") == EventStatus.CANCELLED:
+            return REVOKED_QR_TOKEN_VERSION
+        return event.get("qr_token_version") or 0
+
     async def delete_event_by_id(self, event_id: str) -> None:
         event = await self.collection.find_one({"_id": ObjectId(event_id)})
         if not event:
@@ -476,9 +898,11 @@ class EventModel:
         await self.collection.update_one(
             {"_id": ObjectId(event_id)}, {"$set": {"status": EventStatus.CANCELLED}}
         )
+        await invalidate_near_cache(EVENT_GEO_QUERY_NAMESPACE)
 
     async def delete_all_events(self) -> None:
         await self.collection.update_many({}, {"$set": {"status": EventStatus.CANCELLED}})
+        await invalidate_near_cache(EVENT_GEO_QUERY_NAMESPACE)
 
     async def search_events(
         self,
@@ -585,8 +1009,12 @@ class EventModel:
             pipeline.append({"$skip": skip})
             pipeline.append({"$limit": safe_limit})
 
-            # Execute aggregation
-            docs = await self.collection.aggregate(pipeline).to_list(length=None)
+            docs = await self._find_nearby(
+                filters or {}, lng, lat, max_distance_meters, sort_by, direction, skip, safe_limit
+            )
+            if docs is None:
+                # Execute aggregation
+                docs = await self.collection.aggregate(pipeline).to_list(length=None)
         else:
             # No location filter - use regular find
             direction = 1 if sort_dir == "asc" else -1
@@ -606,6 +1034,7 @@ class EventModel:
         await self.collection.update_one(
             {"_id": ObjectId(event_id)}, {"$set": {"image_s3_key": s3_key}}
         )
+        await invalidate_near_cache(EVENT_GEO_QUERY_NAMESPACE)
         return s3_key
 
     async def get_registered_volunteers_for_event(self, event_id: str) -> list[Volunteer]:
@@ -4,10 +4,13 @@ from bson import ObjectId
 from fastapi import HTTPException
 from motor.motor_asyncio import AsyncIOMotorCollection  # noqa: TCH002
 
+from app.core.cache_constants import ITEM_GEO_QUERY_NAMESPACE
 from app.core.enums import SortOrder
 from app.database.mongodb import db
 from app.schemas.item import CreateItemRequest, Item, ItemSortParam, ItemStatus, UpdateItemRequest
 from app.schemas.location import Location
+from app.utils.geo_cache import find_near_cached, invalidate_near_cache, sort_documents
+from app.utils.map_tiles import cluster_tile
 from app.utils.object_id import parse_object_id
 from app.models.vendor import vendor_model
 from app.schemas.vendor import VendorStatus
@@ -67,6 +70,7 @@ class ItemModel:
             item_data["tags"] = []
 
         result = await self.collection.insert_one(item_data)
+        await invalidate_near_cache(ITEM_GEO_QUERY_NAMESPACE)
         inserted_doc = await self.collection.find_one({"_id": result.inserted_id})
 
         created_item = Item(**inserted_doc)
@@ -188,8 +192,24 @@ class ItemModel:
             pipeline.append({"$skip": skip})
             pipeline.append({"$limit": safe_limit})
 
-            # Execute aggregation
-            items_list = await self.collection.aggregate(pipeline).to_list(length=None)
+            nearby = await find_near_cached(
+                ITEM_GEO_QUERY_NAMESPACE,
+                self.collection,
+                geo_query,
+                lng,
+                lat,
+                max_distance_meters,
+                exclude_fields=("qr_code_image", "qr_token"),
+            )
+            if nearby is not None:
+                if sort_by:
+                    nearby = sort_documents(nearby, sort_by.field_name, sort_direction)
+                else:
+                    nearby = sort_documents(nearby, "_id", 1)
+                items_list = nearby[skip : skip + safe_limit]
+            else:
+                # Execute aggregation
+                items_list = await self.collection.aggregate(pipeline).to_list(length=None)
         else:
             # No location filter - use regular find
             sort_criteria = []
@@ -215,6 +235,9 @@ class ItemModel:
 
         return [Item(**item) for item in items_list]
 
+    async def get_map_clusters(self, x: int, y: int, zoom: int) -> list[dict]:
+        return await cluster_tile(self.collection, {"status": ItemStatus.ACTIVE}, x, y, zoom)
+
     async def get_item_by_id(self, item_id: str) -> Item | None:
         item_obj_id = parse_object_id(item_id)
 
@@ -231,6 +254,7 @@ class ItemModel:
         result = await self.collection.update_one(
             {"_id": item_obj_id}, {"$set": {"status": ItemStatus.PUBLISHED}}
         )
+        await invalidate_near_cache(ITEM_GEO_QUERY_NAMESPACE)
 
         if result.matched_count == 0:
             raise HTTPException(status_code=404, detail="Item not found")
@@ -241,6 +265,7 @@ class ItemModel:
         result = await self.collection.update_one(
             {"_id": item_obj_id}, {"$set": {"status": ItemStatus.ACTIVE}}
         )
+        await invalidate_near_cache(ITEM_GEO_QUERY_NAMESPACE)
 
         if result.matched_count == 0:
             raise HTTPException(status_code=404, detail="Item not found")
@@ -256,6 +281,7 @@ class ItemModel:
             del updated_data["dollar_price"]
 
         result = await db["items"].update_one({"_id": item_obj_id}, {"$set": updated_data})
+        await invalidate_near_cache(ITEM_GEO_QUERY_NAMESPACE)
 
         if result.matched_count == 0:
             raise HTTPException(status_code=404, detail="Item not found")
@@ -265,6 +291,7 @@ class ItemModel:
         updated_event = await self.collection.update_one(
             {"_id": ObjectId(item_id)}, {"$set": {"image_s3_key": s3_key}}
         )
+        await invalidate_near_cache(ITEM_GEO_QUERY_NAMESPACE)
         print(updated_event)
         print("sucessfully updated item image s3 key in mongo")
         return s3_key
@@ -6,8 +6,11 @@ from fastapi import HTTPException, status
 
 from app.database.mongodb import db
 from app.schemas.order import CreateOrderRequest, Order, OrderStatus, UpdateOrderRequest
+from app.utils.pagination import paginate
 
 if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
     from motor.motor_asyncio import AsyncIOMotorCollection
 
 
@@ -25,6 +28,17 @@ class OrderModel:
             OrderModel._instance = cls()
         return OrderModel._instance
 
+    async def create_indexes(self) -> None:
+        try:
+            # Back the newest-first listings
+            await self.collection.create_index([("placed_at", -1), ("_id", -1)])
+            await self.collection.create_index([("item_id", 1), ("placed_at", -1), ("_id", -1)])
+            await self.collection.create_index(
+                [("volunteer_id", 1), ("placed_at", -1), ("_id", -1)]
+            )
+        except Exception:
+            pass
+
     async def get_order_by_id(self, order_id: str) -> Order:
         order = await self.collection.find_one({"_id": ObjectId(order_id)})
         return Order(**order) if order else None
@@ -45,6 +59,38 @@ class OrderModel:
         )
         return [Order(**order) for order in orders_list]
 
+    async def get_orders_page(self, page: int, limit: int) -> tuple[list[Order], int]:
+        return await self._get_orders_page({}, page, limit)
+
+    async def get_orders_by_item_id_page(
+        self, item_id: str, page: int, limit: int
+    ) -> tuple[list[Order], int]:
+        return await self._get_orders_page({"item_id": ObjectId(item_id)}, page, limit)
+
+    async def get_orders_by_volunteer_id_page(
+        self, volunteer_id: str, page: int, limit: int
+    ) -> tuple[list[Order], int]:
+        return await self._get_orders_page({"volunteer_id": ObjectId(volunteer_id)}, page, limit)
+
+    async def _get_orders_page(self, match: dict, page: int, limit: int) -> tuple[list[Order], int]:
+        docs, total = await paginate(
+            self.collection, match, {"placed_at": -1, "_id": -1}, page, limit
+        )
+        return [Order(**doc) for doc in docs], total
+
+    def iter_all_orders(self) -> "AsyncIterator[Order]":
+        return self._iter_orders({})
+
+    def iter_orders_by_item_id(self, item_id: str) -> "AsyncIterator[Order]":
+        return self._iter_orders({"item_id": ObjectId(item_id)})
+
+    def iter_orders_by_volunteer_id(self, volunteer_id: str) -> "AsyncIterator[Order]":
+        return self._iter_orders({"volunteer_id": ObjectId(volunteer_id)})
+
+    async def _iter_orders(self, query: dict, batch_size: int = 500) -> "AsyncIterator[Order]":
+        async for order in self.collection.find(query).batch_size(batch_size):
+            yield Order(**order)
+
     async def create_order(self, order: CreateOrderRequest, volunteer_id: str) -> Order:
         order_data = {
             "item_id": ObjectId(order.item_id),
@@ -54,9 +100,9 @@ class OrderModel:
         }
 
         result = await self.collection.insert_one(order_data)
-        inserted_doc = await self.collection.find_one({"_id": result.inserted_id})
+        order_data["_id"] = result.inserted_id
 
-        return Order(**inserted_doc)
+        return Order(**order_data)
 
     async def update_order_status(self, order_id: str, order_update: UpdateOrderRequest) -> Order:
         update_data = order_update.model_dump(exclude_unset=True)
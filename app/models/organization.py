@@ -4,6 +4,7 @@ from bson import ObjectId
 from fastapi import HTTPException
 from motor.motor_asyncio import AsyncIOMotorCollection  # noqa: TCH002
 
+from app.core.cache_constants import ORGANIZATION_GEO_QUERY_NAMESPACE
 from app.database.mongodb import db
 from app.models.user import user_model
 from app.schemas.location import Location
@@ -13,6 +14,8 @@ from app.schemas.organization import (
     OrganizationStatus,
     UpdateOrganizationRequest,
 )
+from app.utils.geo_cache import find_near_cached, invalidate_near_cache, sort_documents
+from app.utils.map_tiles import cluster_tile
 
 
 class OrganizationModel:
@@ -112,8 +115,27 @@ class OrganizationModel:
             pipeline.append({"$skip": skip})
             pipeline.append({"$limit": safe_limit})
 
-            docs = await self.collection.aggregate(pipeline).to_list(length=None)
-            return [Organization(**d) for d in docs]
+            nearby = await find_near_cached(
+                ORGANIZATION_GEO_QUERY_NAMESPACE,
+                self.collection,
+                filters or {},
+                lng,
+                lat,
+                max_distance_meters,
+            )
+            if nearby is None:
+                docs = await self.collection.aggregate(pipeline).to_list(length=None)
+                return [Organization(**d) for d in docs]
+
+            if sort_by == "status":
+                nearby = sort_documents(
+                    nearby, lambda d: status_order.get(d.get("status"), 99), direction
+                )
+            elif sort_by == "distance":
+                nearby = sort_documents(nearby, "distance", direction)
+            else:
+                nearby = sort_documents(nearby, "name", direction)
+            return [Organization(**d) for d in nearby[skip : skip + safe_limit]]
 
         else:
             # No location filter - use regular find
@@ -157,6 +179,11 @@ class OrganizationModel:
                 docs = await cursor.to_list(length=None)
                 return [Organization(**d) for d in docs]
 
+    async def get_map_clusters(self, x: int, y: int, zoom: int) -> list[dict]:
+        return await cluster_tile(
+            self.collection, {"status": OrganizationStatus.APPROVED}, x, y, zoom
+        )
+
     async def get_organization_by_id(self, id: str) -> Organization:
         org = await self.collection.find_one(
             {"_id": ObjectId(id), "status": OrganizationStatus.APPROVED}
@@ -178,6 +205,7 @@ class OrganizationModel:
         org_data["location"] = location.model_dump()
 
         result = await self.collection.insert_one(org_data)
+        await invalidate_near_cache(ORGANIZATION_GEO_QUERY_NAMESPACE)
 
         await user_model.update_entity_id_by_id(user_id, str(result.inserted_id))
 
@@ -192,6 +220,7 @@ class OrganizationModel:
         if location:
             org_data["location"] = location.model_dump()
         await self.collection.update_one({"_id": ObjectId(org_id)}, {"$set": org_data})
+        await invalidate_near_cache(ORGANIZATION_GEO_QUERY_NAMESPACE)
 
         updated_doc = await self.collection.find_one({"_id": ObjectId(org_id)})
         return Organization(**updated_doc)
@@ -200,6 +229,7 @@ class OrganizationModel:
         await self.collection.update_one(
             {"_id": ObjectId(id)}, {"$set": {"status": OrganizationStatus.DELETED}}
         )
+        await invalidate_near_cache(ORGANIZATION_GEO_QUERY_NAMESPACE)
 
     async def search_organizations(
         self,
@@ -270,6 +300,7 @@ class OrganizationModel:
         await self.collection.update_one(
             {"_id": ObjectId(org_id)}, {"$set": {"image_s3_key": s3_key}}
         )
+        await invalidate_near_cache(ORGANIZATION_GEO_QUERY_NAMESPACE)
         return s3_key
 
 
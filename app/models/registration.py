@@ -1,14 +1,20 @@
-from datetime import datetime
+import logging
+from collections.abc import AsyncIterator  # noqa: TCH003
+from datetime import UTC, datetime
 
 from bson import ObjectId
 from fastapi import HTTPException, status
 from motor.motor_asyncio import AsyncIOMotorCollection  # noqa: TCH002
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 
 from app.database.mongodb import db
 from app.models.event import event_model
 from app.schemas.event import Event
 from app.schemas.registration import CreateRegistrationRequest, Registration, RegistrationStatus
 
+logger = logging.getLogger(__name__)
+
 
 class RegistrationModel:
     _instance: "RegistrationModel" = None
@@ -27,8 +33,12 @@ class RegistrationModel:
     async def create_indexes(self) -> None:
         try:
             await self.registrations.create_index([("volunteer_id", 1), ("registration_status", 1)])
-        except Exception:
-            pass
+            await self.registrations.create_index([("event_id", 1), ("registration_status", 1)])
+            await self.registrations.create_index(
+                [("event_id", 1), ("volunteer_id", 1)], unique=True
+            )
+        except Exception as e:
+            logger.error(f"Error creating registration indexes: {e}")
 
     async def get_volunteers_by_event(self, event_id: str) -> list[Registration]:
         event = await event_model.get_event_by_id(event_id)
@@ -40,6 +50,15 @@ class RegistrationModel:
         ).to_list(length=None)
         return [Registration(**doc) for doc in registrations]
 
+    async def iter_volunteers_by_event(
+        self, event_id: str, batch_size: int = 500
+    ) -> AsyncIterator[Registration]:
+        cursor = self.registrations.find(
+            {"event_id": ObjectId(event_id), "registration_status": RegistrationStatus.UPCOMING}
+        ).batch_size(batch_size)
+        async for doc in cursor:
+            yield Registration(**doc)
+
     async def get_events_by_volunteer(
         self, volunteer_id: str, status: RegistrationStatus | None
     ) -> list[Event]:
@@ -73,7 +92,14 @@ class RegistrationModel:
             {"event_id": event_obj_id, "volunteer_id": volunteer_obj_id}
         )
 
-        if existing:
+        if existing and existing["registration_status"] == RegistrationStatus.COMPLETED:
+            # Reopening it would allow a second check-out and a second round of rewards
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT, detail="You have already completed this event"
+            )
+
+        if existing and existing["registration_status"] != RegistrationStatus.UNREGISTERED:
+            # Already holds a spot, just refresh the registration
             await self.registrations.update_one(
                 {"_id": existing["_id"]},
                 {
@@ -86,19 +112,59 @@ class RegistrationModel:
             updated_doc = await self.registrations.find_one({"_id": existing["_id"]})
             return Registration(**updated_doc)
 
-        registration_data = {
-            "event_id": event_obj_id,
-            "volunteer_id": volunteer_obj_id,
-            "registered_at": datetime.now(),
-            "registration_status": RegistrationStatus.UPCOMING,
-            "clocked_in": None,
-            "clocked_out": None,
-        }
+        await self._reserve_spot(registration.event_id)
+
+        try:
+            if existing:
+                # Only the request that flips the status back keeps the reserved spot
+                updated_doc = await self.registrations.find_one_and_update(
+                    {
+                        "_id": existing["_id"],
+                        "registration_status": RegistrationStatus.UNREGISTERED,
+                    },
+                    {
+                        "$set": {
+                            "registration_status": RegistrationStatus.UPCOMING,
+                            "registered_at": datetime.now(),
+                        }
+                    },
+                    return_document=ReturnDocument.AFTER,
+                )
+                if updated_doc is None:
+                    await event_model.release_spot(registration.event_id)
+                    updated_doc = await self.registrations.find_one({"_id": existing["_id"]})
+                return Registration(**updated_doc)
 
-        result = await self.registrations.insert_one(registration_data)
-        inserted_doc = await self.registrations.find_one({"_id": result.inserted_id})
+            registration_data = {
+                "event_id": event_obj_id,
+                "volunteer_id": volunteer_obj_id,
+                "registered_at": datetime.now(),
+                "registration_status": RegistrationStatus.UPCOMING,
+                "clocked_in": None,
+                "clocked_out": None,
+            }
+            result = await self.registrations.insert_one(registration_data)
+        except DuplicateKeyError as e:
+            # A concurrent request registered this volunteer first
+            await event_model.release_spot(registration.event_id)
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT, detail="Already registered for this event"
+            ) from e
+        except Exception:
+            await event_model.release_spot(registration.event_id)
+            raise
 
-        return Registration(**inserted_doc)
+        registration_data["_id"] = result.inserted_id
+        return Registration(**registration_data)
+
+    async def _reserve_spot(self, event_id: str) -> None:
+        if await event_model.reserve_spot(event_id):
+            return
+
+        # Only look the event up to explain why the reservation failed
+        if not await event_model.get_event_by_id(event_id):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Event not found")
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Event is full")
 
     async def unregister_registration(
         self, registration_id: str, volunteer_id: str
@@ -116,37 +182,155 @@ class RegistrationModel:
                 detail="Not authorized to unregister from this event",
             )
 
-        await self.registrations.update_one(
-            {"_id": ObjectId(registration_id)},
+        if registration["registration_status"] == RegistrationStatus.COMPLETED:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Can't unregister from a completed event",
+            )
+
+        result = await self.registrations.update_one(
+            {
+                "_id": ObjectId(registration_id),
+                "registration_status": {
+                    "$nin": [RegistrationStatus.UNREGISTERED, RegistrationStatus.COMPLETED]
+                },
+            },
             {"$set": {"registration_status": RegistrationStatus.UNREGISTERED}},
         )
+        if result.modified_count == 1:
+            await event_model.release_spot(str(registration["event_id"]))
+
         updated_doc = await self.registrations.find_one({"_id": ObjectId(registration_id)})
         return Registration(**updated_doc)
 
     async def check_in_registration(self, volunteer_id: str, event_id: str) -> Registration:
-        await self.registrations.update_one(
-            {"volunteer_id": ObjectId(volunteer_id), "event_id": ObjectId(event_id)},
-            {"$set": {"clocked_in": datetime.now()}},
-        )
-        updated_doc = await self.registrations.find_one(
-            {"volunteer_id": ObjectId(volunteer_id), "event_id": ObjectId(event_id)}
+        registration_filter = {
+            "event_id": ObjectId(event_id),
+            "volunteer_id": ObjectId(volunteer_id),
+            "registration_status": RegistrationStatus.UPCOMING,
+        }
+        updated_doc = await self.registrations.find_one_and_update(
+            {**registration_filter, "clocked_in": None},
+            {"$set": {"clocked_in": datetime.now(UTC)}},
+            return_document=ReturnDocument.AFTER,
         )
-        return Registration(**updated_doc)
+        if updated_doc:
+            return Registration(**updated_doc)
+
+        # Scanning again after checking in keeps the original check-in time
+        existing = await self.registrations.find_one(registration_filter)
+        if not existing:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Volunteer did not sign up for this event",
+            )
+        return Registration(**existing)
 
     async def check_out_registration(self, volunteer_id: str, event_id: str) -> Registration:
-        await self.registrations.update_one(
-            {"volunteer_id": ObjectId(volunteer_id), "event_id": ObjectId(event_id)},
+        # Completing the registration in the same write makes check-out (and its rewards)
+        # happen at most once
+        updated_doc = await self.registrations.find_one_and_update(
+            {
+                "event_id": ObjectId(event_id),
+                "volunteer_id": ObjectId(volunteer_id),
+                "registration_status": RegistrationStatus.UPCOMING,
+            },
             {
                 "$set": {
-                    "clocked_out": datetime.now(),
+                    "clocked_out": datetime.now(UTC),
                     "registration_status": RegistrationStatus.COMPLETED,
                 }
             },
+            return_document=ReturnDocument.AFTER,
         )
-        updated_doc = await self.registrations.find_one(
-            {"volunteer_id": ObjectId(volunteer_id), "event_id": ObjectId(event_id)}
-        )
+        if not updated_doc:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Volunteer is not signed up for this event or has already checked out",
+            )
         return Registration(**updated_doc)
 
+    async def get_registrations_for_volunteers(
+        self, event_id: str, volunteer_ids: list[str]
+    ) -> list[Registration]:
+        registrations = await self.registrations.find(
+            {
+                "event_id": ObjectId(event_id),
+                "volunteer_id": {"$in": [ObjectId(volunteer_id) for volunteer_id in volunteer_ids]},
+            }
+        ).to_list(length=None)
+        return [Registration(**doc) for doc in registrations]
+
+    async def bulk_check_in(self, event_id: str, scans: dict[str, datetime]) -> list[Registration]:
+        """
+        Check in every scanned volunteer in one write, with the same conditions as
+        check_in_registration. Scan times must be naive UTC at millisecond precision, as
+        stored by Mongo. Returns the registrations this call checked in.
+        """
+        if not scans:
+            return []
+        await self.registrations.update_many(
+            {
+                "event_id": ObjectId(event_id),
+                "volunteer_id": {"$in": [ObjectId(volunteer_id) for volunteer_id in scans]},
+                "registration_status": RegistrationStatus.UPCOMING,
+                "clocked_in": None,
+            },
+            [{"$set": {"clocked_in": _scan_time_expression(scans)}}],
+        )
+
+        registrations = await self.get_registrations_for_volunteers(event_id, list(scans))
+        return [
+            registration
+            for registration in registrations
+            if registration.clocked_in == scans[registration.volunteer_id]
+        ]
+
+    async def bulk_check_out(self, event_id: str, scans: dict[str, datetime]) -> list[Registration]:
+        """
+        Check out every scanned volunteer in one write, with the same conditions as
+        check_out_registration. Scan times must be naive UTC at millisecond precision, as
+        stored by Mongo. Returns the registrations this call completed.
+        """
+        if not scans:
+            return []
+        await self.registrations.update_many(
+            {
+                "event_id": ObjectId(event_id),
+                "volunteer_id": {"$in": [ObjectId(volunteer_id) for volunteer_id in scans]},
+                "registration_status": RegistrationStatus.UPCOMING,
+            },
+            [
+                {
+                    "$set": {
+                        "clocked_out": _scan_time_expression(scans),
+                        "registration_status": RegistrationStatus.COMPLETED,
+                    }
+                }
+            ],
+        )
+
+        # Anything checked out concurrently has a different clocked_out, so only the
+        # registrations carrying this batch's timestamps were completed here
+        registrations = await self.get_registrations_for_volunteers(event_id, list(scans))
+        return [
+            registration
+            for registration in registrations
+            if registration.registration_status == RegistrationStatus.COMPLETED
+            and registration.clocked_out == scans[registration.volunteer_id]
+        ]
+
+
+def _scan_time_expression(scans: dict[str, datetime]) -> dict:
+    # Each matched registration gets its own volunteer's scan time within a single update
+    return {
+        "$switch": {
+            "branches": [
+                {"case": {"$eq": ["$volunteer_id", ObjectId(volunteer_id)]}, "then": scanned_at}
+                for volunteer_id, scanned_at in scans.items()
+            ]
+        }
+    }
+
 
 registration_model = RegistrationModel.get_instance()
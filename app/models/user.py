@@ -1,7 +1,13 @@
+from typing import TYPE_CHECKING
+
 from pydantic import EmailStr
 
 from app.database.mongodb import db
 from app.schemas.user import User
+from app.utils.pagination import paginate
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
 
 
 class UserModel:
@@ -34,6 +40,14 @@ class UserModel:
         docs = await self.collection.find().to_list(1000)
         return [User(**doc) for doc in docs]
 
+    async def get_page(self, page: int, limit: int) -> tuple[list[User], int]:
+        docs, total = await paginate(self.collection, {}, {"_id": 1}, page, limit)
+        return [User(**doc) for doc in docs], total
+
+    async def iter_all(self, batch_size: int = 500) -> "AsyncIterator[User]":
+        async for doc in self.collection.find().batch_size(batch_size):
+            yield User(**doc)
+
     async def check_existing_username_and_email(self, username: str, email: EmailStr) -> bool:
         existing_user = await self.collection.find_one(
             {"$or": [{"email": email.lower()}, {"username": username.lower()}]}
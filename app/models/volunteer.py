@@ -4,10 +4,10 @@ from typing import TYPE_CHECKING
 
 from bson import ObjectId
 from fastapi import HTTPException, status
+from pymongo import ReturnDocument, UpdateOne
 
 from app.database.mongodb import db
 from app.models.user import user_model
-from app.schemas.organization import Organization
 from app.schemas.volunteer import (
     CreateVolunteerRequest,
     EventType,
@@ -15,8 +15,11 @@ from app.schemas.volunteer import (
     UpdateVolunteerRequest,
     Volunteer,
 )
+from app.utils.pagination import paginate
 
 if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
     from motor.motor_asyncio import AsyncIOMotorCollection
 
 logger = logging.getLogger(__name__)
@@ -39,6 +42,8 @@ class VolunteerModel:
     async def create_indexes(self) -> None:
         try:
             await self.collection.create_index("preferences")
+            await self.collection.create_index("current_level")
+            await self.collection.create_index([("experience", -1), ("first_name", 1)])
             logger.info("Volunteer recommendation indexes created successfully")
         except Exception as e:
             logger.error(f"Error creating volunteer indexes: {e}")
@@ -64,9 +69,17 @@ class VolunteerModel:
         volunteers_list = await self.collection.find().to_list(length=None)
         return [self._to_volunteer(volunteer) for volunteer in volunteers_list]
 
+    async def get_volunteers_page(self, page: int, limit: int) -> tuple[list[Volunteer], int]:
+        docs, total = await paginate(self.collection, {}, {"_id": 1}, page, limit)
+        return [self._to_volunteer(doc) for doc in docs], total
+
+    async def iter_all_volunteers(self, batch_size: int = 500) -> "AsyncIterator[Volunteer]":
+        async for volunteer in self.collection.find().batch_size(batch_size):
+            yield self._to_volunteer(volunteer)
+
     async def get_top_x_volunteers(self, x: int) -> list[Volunteer]:
         volunteers_list = (
-            await self.collection.find()
+            await self.collection.find({"is_active": {"$ne": False}})
             .sort(
                 {
                     "experience": -1,
@@ -78,58 +91,28 @@ class VolunteerModel:
         )
         return [self._to_volunteer(volunteer) for volunteer in volunteers_list]
 
-    async def get_top_organizations(self, volunteer_id: str, limit: int) -> list[Organization]:
-        pipeline = [
-            {"$match": {"_id": volunteer_id}},
-            # Get all completed registrations for volunteer
-            {
-                "$lookup": {
-                    "from": "registrations",
-                    "localField": "_id",
-                    "foreignField": "volunteer_id",
-                    "as": "registrations",
-                }
-            },
-            {"$unwind": "$registrations"},
-            {"$match": {"registrations.registration_status": "COMPLETED"}},
-            # Get events from those registrations
-            {
-                "$lookup": {
-                    "from": "event",
-                    "localField": "event_id",
-                    "foreignField": "_id",
-                    "as": "event",
-                }
-            },
-            {"$unwind": "$event"},
-            # Calculate duration for each event and group by organization
-            {
-                "$addFields": {
-                    "duration_ms": {"$subtract": ["$event.end_date_time", "$event.start_date_time"]}
-                }
-            },
-            {
-                "$group": {
-                    "_id": "$event.organization_id",
-                    "total_duration_ms": {"$sum": "$duration_ms"},
-                }
-            },
-            {"$sort": {"total_duration_ms": -1}},
-            {"$limit": limit},
-            {
-                "$lookup": {
-                    "from": "organizations",
-                    "localField": "_id",
-                    "foreignField": "_id",
-                    "as": "organization",
-                }
-            },
-            {"$unwind": "$organization"},
-            {"$replaceRoot": {"newRoot": "$organization"}},
+    async def get_volunteers_by_ids(self, volunteer_ids: list[str]) -> list[Volunteer]:
+        volunteers_list = await self.collection.find(
+            {"_id": {"$in": [ObjectId(volunteer_id) for volunteer_id in volunteer_ids]}}
+        ).to_list(length=None)
+        # Preserve the order of the requested ids
+        volunteers_by_id = {str(volunteer["_id"]): volunteer for volunteer in volunteers_list}
+        return [
+            self._to_volunteer(volunteers_by_id[volunteer_id])
+            for volunteer_id in volunteer_ids
+            if volunteer_id in volunteers_by_id
         ]
-        results = await self.collection.aggregate(pipeline).to_list()
 
-        return [Organization(**doc) for doc in results]
+    async def iter_experience(self, batch_size: int) -> "AsyncIterator[dict[str, int]]":
+        batch: dict[str, int] = {}
+        volunteers = self.collection.find({"is_active": {"$ne": False}}, {"experience": 1})
+        async for volunteer in volunteers.batch_size(batch_size):
+            batch[str(volunteer["_id"])] = volunteer.get("experience", 0)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = {}
+        if batch:
+            yield batch
 
     async def create_volunteer(self, volunteer: CreateVolunteerRequest, user_id: str) -> Volunteer:
         volunteer_data = volunteer.model_dump()
@@ -173,30 +156,77 @@ class VolunteerModel:
 
     async def update_volunteer(
         self, volunteer_id: str, volunteer: UpdateVolunteerRequest
-    ) -> Volunteer:
-        existing_volunteer = await self.get_volunteer_by_id(volunteer_id)
+    ) -> Volunteer | None:
         volunteer_data = volunteer.model_dump(exclude_unset=True)
 
-        updated_data = {}
-        curr_training_docs = []
+        # Only touch the fields being changed; a new training document is appended in place
+        update: dict = {}
+        new_training_doc = volunteer_data.pop("training_document", None)
+        if new_training_doc is not None:
+            update["$push"] = {"training_documents": new_training_doc}
+        if volunteer_data:
+            update["$set"] = volunteer_data
 
-        # retrieving and converting existing training documents from volunteer
-        for td in existing_volunteer.training_documents:
-            if isinstance(td, TrainingDocument):
-                curr_training_docs.append(td.model_dump())
-            else:
-                curr_training_docs.append(td)
+        if not update:
+            return await self.get_volunteer_by_id(volunteer_id)
+
+        updated_doc = await self.collection.find_one_and_update(
+            {"_id": ObjectId(volunteer_id)}, update, return_document=ReturnDocument.AFTER
+        )
+        return self._to_volunteer(updated_doc) if updated_doc else None
+
+    async def increment_rewards(
+        self, volunteer_id: str, experience: int, coins: int
+    ) -> Volunteer | None:
+        updated_doc = await self.collection.find_one_and_update(
+            {"_id": ObjectId(volunteer_id)},
+            {"$inc": {"experience": experience, "coins": coins}},
+            return_document=ReturnDocument.AFTER,
+        )
+        return self._to_volunteer(updated_doc) if updated_doc else None
+
+    async def bulk_increment_rewards(
+        self, volunteer_ids: list[str], experience: int, coins: int
+    ) -> list[Volunteer]:
+        if not volunteer_ids:
+            return []
+
+        volunteer_obj_ids = [ObjectId(volunteer_id) for volunteer_id in volunteer_ids]
+        await self.collection.bulk_write(
+            [
+                UpdateOne(
+                    {"_id": volunteer_obj_id},
+                    {"$inc": {"experience": experience, "coins": coins}},
+                )
+                for volunteer_obj_id in volunteer_obj_ids
+            ],
+            ordered=False,
+        )
+        volunteers_list = await self.collection.find({"_id": {"$in": volunteer_obj_ids}}).to_list(
+            length=None
+        )
+        return [self._to_volunteer(volunteer) for volunteer in volunteers_list]
 
-        # appending new training document to exisitng documents
-        if "training_document" in volunteer_data:
-            new_training_doc = volunteer_data.pop("training_document")
-            curr_training_docs.append(TrainingDocument(**new_training_doc).model_dump())
+    async def deduct_coins(self, volunteer_id: str, amount: int) -> bool:
+        # The balance check and deduction happen in one write, so concurrent redemptions
+        # can't both spend the same coins
+        result = await self.collection.update_one(
+            {"_id": ObjectId(volunteer_id), "coins": {"$gte": amount}},
+            {"$inc": {"coins": -amount}},
+        )
+        # matched, not modified: a zero-price redemption changes nothing but still succeeds
+        return result.matched_count == 1
 
-        updated_data = {**volunteer_data, "training_documents": curr_training_docs}
+    async def refund_coins(self, volunteer_id: str, amount: int) -> None:
+        await self.collection.update_one(
+            {"_id": ObjectId(volunteer_id)}, {"$inc": {"coins": amount}}
+        )
 
-        await self.collection.update_one({"_id": ObjectId(volunteer_id)}, {"$set": updated_data})
-        updated_doc = await self.collection.find_one({"_id": ObjectId(volunteer_id)})
-        return self._to_volunteer(updated_doc)
+    async def raise_level(self, volunteer_id: str, level: int) -> None:
+        # $max so a concurrent checkout that computed a lower level can't move it back down
+        await self.collection.update_one(
+            {"_id": ObjectId(volunteer_id)}, {"$max": {"current_level": level}}
+        )
 
     def _to_volunteer(self, doc) -> Volunteer:
         volunteer_data = doc.copy()
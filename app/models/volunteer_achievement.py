@@ -1,10 +1,16 @@
+import logging
+from datetime import UTC, datetime
 from typing import TYPE_CHECKING
 
 from bson import ObjectId
 from fastapi import HTTPException
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
 
 from app.database.mongodb import db
 from app.schemas.achievement import VolunteerReceivedAchievementResponse
+from app.schemas.karp_event import KarpEvent
+from app.schemas.registration import RegistrationStatus
 from app.schemas.volunteer_achievement import (
     CreateVolunteerAchievementRequest,
     VolunteerAchievement,
@@ -14,6 +20,8 @@ from app.utils.object_id import parse_object_id
 if TYPE_CHECKING:
     from motor.motor_asyncio import AsyncIOMotorCollection
 
+logger = logging.getLogger(__name__)
+
 
 class VolunteerAchievementModel:
     _instance: "VolunteerAchievementModel" = None
@@ -29,6 +37,35 @@ class VolunteerAchievementModel:
             VolunteerAchievementModel._instance = cls()
         return VolunteerAchievementModel._instance
 
+    async def create_indexes(self) -> None:
+        # Grants rely on this index to skip achievements a volunteer already holds, so a
+        # failure here stops startup instead of letting duplicates through
+        keys = [("volunteer_id", 1), ("achievement_id", 1)]
+        indexes = await self.collection.index_information()
+        if not any(index.get("unique") and index["key"] == keys for index in indexes.values()):
+            await self._remove_duplicate_achievements()
+        await self.collection.create_index(keys, unique=True)
+        logger.info("Volunteer achievement indexes created successfully")
+
+    async def _remove_duplicate_achievements(self) -> None:
+        # Keep the earliest award of each achievement per volunteer
+        pipeline = [
+            {"$sort": {"received_at": 1, "_id": 1}},
+            {
+                "$group": {
+                    "_id": {"volunteer_id": "$volunteer_id", "achievement_id": "$achievement_id"},
+                    "ids": {"$push": "$_id"},
+                }
+            },
+            {"$match": {"ids.1": {"$exists": True}}},
+        ]
+        duplicate_ids = []
+        async for group in self.collection.aggregate(pipeline, allowDiskUse=True):
+            duplicate_ids.extend(group["ids"][1:])
+        if duplicate_ids:
+            await self.collection.delete_many({"_id": {"$in": duplicate_ids}})
+            logger.warning(f"Removed {len(duplicate_ids)} duplicate volunteer achievements")
+
     async def create_volunteer_achievement(
         self, volunteer_achievement: CreateVolunteerAchievementRequest
     ) -> VolunteerAchievement:
@@ -38,10 +75,91 @@ class VolunteerAchievementModel:
             "received_at": volunteer_achievement.received_at,
         }
 
-        result = await self.collection.insert_one(volunteer_achievement_data)
-        inserted_doc = await self.collection.find_one({"_id": result.inserted_id})
+        try:
+            await self.collection.insert_one(volunteer_achievement_data)
+        except DuplicateKeyError as e:
+            raise HTTPException(
+                status_code=409, detail="Volunteer already has this achievement"
+            ) from e
+
+        # insert_one sets _id on the dict it was given
+        return VolunteerAchievement(**volunteer_achievement_data)
+
+    async def grant_achievements(
+        self, volunteer_id: str, achievement_ids: list[str], received_at: datetime
+    ) -> int:
+        """
+        Upsert one volunteerAchievements document per achievement in a single round trip.
+        Achievements the volunteer already holds are left untouched, relying on the unique
+        (volunteer_id, achievement_id) index. Returns the number of newly granted achievements.
+        """
+        if not achievement_ids:
+            return 0
+
+        volunteer_obj_id = ObjectId(volunteer_id)
+        operations = [
+            UpdateOne(
+                {"volunteer_id": volunteer_obj_id, "achievement_id": ObjectId(achievement_id)},
+                {"$setOnInsert": {"received_at": received_at}},
+                upsert=True,
+            )
+            for achievement_id in dict.fromkeys(achievement_ids)
+        ]
+        result = await self.collection.bulk_write(operations, ordered=False)
+        return result.upserted_count
+
+    async def backfill_achievement(
+        self, achievement_id: str, event_type: KarpEvent, threshold: int
+    ) -> list[str]:
+        """
+        Grant an achievement to every volunteer who already meets its threshold, entirely
+        server-side with a single aggregation that $merges into volunteerAchievements.
+        Returns the ids of the volunteers it was newly granted to.
+        """
+        # Stamped on every document this run inserts so they can be found afterwards; Mongo
+        # keeps milliseconds
+        received_at = datetime.now(UTC)
+        received_at = received_at.replace(microsecond=received_at.microsecond // 1000 * 1000)
+        merge_stages = [
+            {
+                "$project": {
+                    "_id": 0,
+                    "volunteer_id": "$_id",
+                    "achievement_id": ObjectId(achievement_id),
+                    "received_at": received_at,
+                }
+            },
+            {
+                "$merge": {
+                    "into": self.collection.name,
+                    "on": ["volunteer_id", "achievement_id"],
+                    "whenMatched": "keepExisting",
+                    "whenNotMatched": "insert",
+                }
+            },
+        ]
 
-        return VolunteerAchievement(**inserted_doc)
+        if event_type == KarpEvent.USER_LEVEL_UP:
+            source = db["volunteers"]
+            pipeline = [{"$match": {"current_level": {"$gte": threshold}}}, *merge_stages]
+        elif event_type == KarpEvent.VOLUNTEER_EVENT_COMPLETION:
+            source = db["registrations"]
+            pipeline = [
+                {"$match": {"registration_status": RegistrationStatus.COMPLETED}},
+                {"$group": {"_id": "$volunteer_id", "completed": {"$sum": 1}}},
+                {"$match": {"completed": {"$gte": threshold}}},
+                *merge_stages,
+            ]
+        else:
+            return []
+
+        # $merge writes its output directly, so there is no result set to consume
+        await source.aggregate(pipeline).to_list(length=None)
+        granted = self.collection.find(
+            {"achievement_id": ObjectId(achievement_id), "received_at": received_at},
+            {"volunteer_id": 1},
+        )
+        return [str(doc["volunteer_id"]) async for doc in granted]
 
     async def get_all_volunteer_achievements(self) -> list[VolunteerAchievement]:
         volunteer_achievements_list = await self.collection.find().to_list(length=None)
@@ -0,0 +1,163 @@
+import logging
+from typing import TYPE_CHECKING
+
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from app.database.mongodb import db
+from app.schemas.organization import Organization
+from app.schemas.registration import RegistrationStatus
+
+if TYPE_CHECKING:
+    from motor.motor_asyncio import AsyncIOMotorCollection
+
+logger = logging.getLogger(__name__)
+
+
+class VolunteerOrganizationHoursModel:
+    """
+    Rollup of completed volunteering per (volunteer, organization), kept up to date on
+    checkout and rebuildable from registrations.
+    """
+
+    _instance: "VolunteerOrganizationHoursModel" = None
+
+    def __init__(self):
+        if VolunteerOrganizationHoursModel._instance is not None:
+            raise Exception("This class is a singleton!")
+        self.collection: AsyncIOMotorCollection = db["volunteerOrganizationHours"]
+
+    @classmethod
+    def get_instance(cls) -> "VolunteerOrganizationHoursModel":
+        if VolunteerOrganizationHoursModel._instance is None:
+            VolunteerOrganizationHoursModel._instance = cls()
+        return VolunteerOrganizationHoursModel._instance
+
+    async def create_indexes(self) -> None:
+        try:
+            await self.collection.create_index(
+                [("volunteer_id", 1), ("organization_id", 1)], unique=True
+            )
+            await self.collection.create_index([("volunteer_id", 1), ("total_minutes", -1)])
+            await self.collection.create_index([("organization_id", 1), ("total_minutes", -1)])
+            logger.info("Volunteer organization hours indexes created successfully")
+        except Exception as e:
+            logger.error(f"Error creating volunteer organization hours indexes: {e}")
+
+    async def record_completion(
+        self, volunteer_id: str, organization_id: str, minutes: int
+    ) -> None:
+        await self.collection.update_one(
+            {"volunteer_id": ObjectId(volunteer_id), "organization_id": ObjectId(organization_id)},
+            {"$inc": {"total_minutes": minutes, "events_completed": 1}},
+            upsert=True,
+        )
+
+    async def record_completions(
+        self, volunteer_ids: list[str], organization_id: str, minutes: int
+    ) -> None:
+        if not volunteer_ids:
+            return
+
+        organization_obj_id = ObjectId(organization_id)
+        await self.collection.bulk_write(
+            [
+                UpdateOne(
+                    {
+                        "volunteer_id": ObjectId(volunteer_id),
+                        "organization_id": organization_obj_id,
+                    },
+                    {"$inc": {"total_minutes": minutes, "events_completed": 1}},
+                    upsert=True,
+                )
+                for volunteer_id in volunteer_ids
+            ],
+            ordered=False,
+        )
+
+    async def get_top_organizations(self, volunteer_id: str, limit: int) -> list[Organization]:
+        pipeline = [
+            {"$match": {"volunteer_id": ObjectId(volunteer_id)}},
+            {"$sort": {"total_minutes": -1}},
+            {"$limit": limit},
+            {
+                "$lookup": {
+                    "from": "organizations",
+                    "localField": "organization_id",
+                    "foreignField": "_id",
+                    "as": "organization",
+                }
+            },
+            {"$unwind": "$organization"},
+            {"$replaceRoot": {"newRoot": "$organization"}},
+        ]
+        results = await self.collection.aggregate(pipeline).to_list(length=None)
+
+        return [Organization(**doc) for doc in results]
+
+    async def rebuild(self) -> None:
+        # Recompute every row from completed registrations and merge it over the rollup
+        pipeline = [
+            # Same registrations that earn checkout rewards
+            {
+                "$match": {
+                    "registration_status": RegistrationStatus.COMPLETED,
+                    "clocked_in": {"$ne": None},
+                    "clocked_out": {"$ne": None},
+                }
+            },
+            {
+                "$lookup": {
+                    "from": "events",
+                    "localField": "event_id",
+                    "foreignField": "_id",
+                    "as": "event",
+                }
+            },
+            {"$unwind": "$event"},
+            {
+                "$group": {
+                    "_id": {
+                        "volunteer_id": "$volunteer_id",
+                        "organization_id": {"$toObjectId": "$event.organization_id"},
+                    },
+                    "total_minutes": {
+                        "$sum": {
+                            "$floor": {
+                                "$divide": [
+                                    {
+                                        "$subtract": [
+                                            {"$toDate": "$event.end_date_time"},
+                                            {"$toDate": "$event.start_date_time"},
+                                        ]
+                                    },
+                                    60 * 1000,
+                                ]
+                            }
+                        }
+                    },
+                    "events_completed": {"$sum": 1},
+                }
+            },
+            {
+                "$project": {
+                    "_id": 0,
+                    "volunteer_id": "$_id.volunteer_id",
+                    "organization_id": "$_id.organization_id",
+                    "total_minutes": 1,
+                    "events_completed": 1,
+                }
+            },
+            {
+                "$merge": {
+                    "into": self.collection.name,
+                    "on": ["volunteer_id", "organization_id"],
+                    "whenMatched": "replace",
+                    "whenNotMatched": "insert",
+                }
+            },
+        ]
+        await db["registrations"].aggregate(pipeline).to_list(length=None)
+
+
+volunteer_organization_hours_model = VolunteerOrganizationHoursModel.get_instance()
@@ -5,6 +5,7 @@ from bson import ObjectId
 from pydantic import AliasChoices, BaseModel, ConfigDict, Field, field_validator
 
 from app.schemas.location import Location
+from app.schemas.pagination import Page
 from app.schemas.volunteer import EventType
 
 
@@ -30,6 +31,8 @@ class Event(BaseModel):
     organization_id: str
     status: EventStatus = EventStatus.PUBLISHED
     max_volunteers: int
+    # Active (not unregistered) registrations, maintained on register/unregister
+    registered_count: int = 0
     coins: int
     description: str | None = None
     keywords: list[str] | None = None
@@ -43,6 +46,8 @@ class Event(BaseModel):
     check_in_qr_token: str | None = None
     check_out_qr_code_image: str | None = None
     check_out_qr_token: str | None = None
+    # Signed into the QR tokens; bumped whenever the codes are regenerated
+    qr_token_version: int = 0
     manual_difficulty_coefficient: float = 1.0
     ai_difficulty_coefficient: float = 1.0
     difficulty_coefficient: float = 1.0
@@ -96,3 +101,18 @@ class UpdateEventRequest(BaseModel):
     check_out_qr_token: str | None = None
 
     model_config = ConfigDict(use_enum_values=True, from_attributes=True)
+
+
+class FacetCount(BaseModel):
+    value: str
+    count: int
+
+
+class EventFacets(BaseModel):
+    keywords: list[FacetCount]
+    weekdays: list[FacetCount]
+    statuses: list[FacetCount]
+
+
+class EventFacetPage(Page[Event]):
+    facets: EventFacets
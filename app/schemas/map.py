@@ -0,0 +1,13 @@
+from pydantic import BaseModel
+
+
+class MapCluster(BaseModel):
+    lat: float
+    lng: float
+    count: int
+    id: str | None = None
+
+
+class MapClusterResponse(BaseModel):
+    zoom: int
+    clusters: list[MapCluster]
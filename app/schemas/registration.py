@@ -34,3 +34,25 @@ class Registration(BaseModel):
 
 class CreateRegistrationRequest(BaseModel):
     event_id: str
+
+
+class ScanType(str, Enum):
+    CHECK_IN = "check_in"
+    CHECK_OUT = "check_out"
+
+
+class RegistrationScan(BaseModel):
+    volunteer_id: str
+    qr_token: str
+    scanned_at: datetime
+
+
+class BulkScanRequest(BaseModel):
+    scan_type: ScanType
+    scans: list[RegistrationScan] = Field(max_length=1000)
+
+
+class ScanResult(BaseModel):
+    volunteer_id: str
+    applied: bool
+    detail: str | None = None
@@ -93,3 +93,9 @@ class UpdateVolunteerRequest(BaseModel):
     phone: str | None = None
     experience: int | None = None
     current_level: int | None = None
+
+
+class VolunteerRankResponse(BaseModel):
+    rank: int
+    experience: int
+    total: int
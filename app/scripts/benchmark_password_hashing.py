@@ -0,0 +1,106 @@
+"""
+Benchmark login throughput and the latency of unrelated requests while many logins run
+concurrently on a single worker.
+
+Compares the previous behavior (bcrypt called inline from the async handler) with the
+bounded thread pool used by app.utils.user.verify_password.
+
+Usage:
+    python -m app.scripts.benchmark_password_hashing [--logins 40] [--concurrency 20]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.utils.user import pwd_context, verify_password
+
+PASSWORD = "BenchmarkPassword123!"
+PROBE_INTERVAL_SECONDS = 0.005
+
+
+async def inline_login(hashed_password: str) -> bool:
+    return pwd_context.verify(PASSWORD, hashed_password)
+
+
+async def offloaded_login(hashed_password: str) -> bool:
+    return await verify_password(PASSWORD, hashed_password)
+
+
+async def unrelated_request() -> None:
+    # Stand-in for a cheap endpoint that only awaits I/O
+    await asyncio.sleep(0)
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def run_scenario(login, hashed_password: str, logins: int, concurrency: int) -> dict:
+    latencies: list[float] = []
+    done = asyncio.Event()
+
+    async def probe() -> None:
+        # Requests arrive on a fixed schedule, so time spent waiting for a blocked loop
+        # counts towards their latency
+        arrival = time.perf_counter()
+        while not done.is_set():
+            await asyncio.sleep(max(0.0, arrival - time.perf_counter()))
+            await unrelated_request()
+            latencies.append((time.perf_counter() - arrival) * 1000)
+            arrival += PROBE_INTERVAL_SECONDS
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def limited_login() -> None:
+        async with semaphore:
+            await login(hashed_password)
+
+    probe_task = asyncio.create_task(probe())
+    # Let the probe record a baseline before the spike
+    await asyncio.sleep(PROBE_INTERVAL_SECONDS * 2)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(limited_login() for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+
+    done.set()
+    await probe_task
+
+    return {
+        "logins_per_second": logins / elapsed,
+        "elapsed_seconds": elapsed,
+        "probe_requests": len(latencies),
+        "probe_p50_ms": statistics.median(latencies),
+        "probe_p99_ms": percentile(latencies, 99),
+        "probe_max_ms": max(latencies),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--logins", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    hashed_password = pwd_context.hash(PASSWORD)
+
+    print("=" * 60)
+    print(f"{args.logins} logins, {args.concurrency} concurrent")
+    print("=" * 60)
+    for name, login in [("inline", inline_login), ("thread pool", offloaded_login)]:
+        result = await run_scenario(login, hashed_password, args.logins, args.concurrency)
+        print(f"\n{name}")
+        print(f"  login throughput:      {result['logins_per_second']:.1f} logins/s")
+        print(f"  total time:            {result['elapsed_seconds']:.2f} s")
+        print(f"  unrelated requests:    {result['probe_requests']}")
+        print(f"  unrelated p50 latency: {result['probe_p50_ms']:.2f} ms")
+        print(f"  unrelated p99 latency: {result['probe_p99_ms']:.2f} ms")
+        print(f"  unrelated max latency: {result['probe_max_ms']:.2f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,38 @@
+"""
+Regenerate the offline gazetteer table used for city/state location filters.
+
+Reads app/data/us_places.csv (city,state,lat,lng; leave city empty for a whole state) and
+writes the sorted fixed-width table at app/data/us_places.txt. Run it after editing the CSV.
+
+Usage:
+    python -m app.scripts.build_gazetteer
+"""
+
+import csv
+
+from app.utils.gazetteer import GAZETTEER_PATH, format_record, normalize_state, place_key
+
+SOURCE_PATH = GAZETTEER_PATH.with_suffix(".csv")
+
+
+def main():
+    records: dict[str, str] = {}
+    with open(SOURCE_PATH, newline="") as f:
+        for row in csv.DictReader(f):
+            state_code = normalize_state(row["state"])
+            if state_code is None:
+                raise ValueError(f"Unknown state '{row['state']}' in {SOURCE_PATH}")
+            key = place_key(row["city"], state_code)
+            if key in records:
+                raise ValueError(f"Duplicate place '{key}' in {SOURCE_PATH}")
+            records[key] = format_record(key, float(row["lat"]), float(row["lng"]))
+
+    # The lookup binary-searches on the raw bytes, so sort the same way
+    with open(GAZETTEER_PATH, "w", newline="\n") as f:
+        f.writelines(records[key] for key in sorted(records, key=str.encode))
+
+    print(f"✓ Wrote {len(records)} places to {GAZETTEER_PATH}")
+
+
+if __name__ == "__main__":
+    main()
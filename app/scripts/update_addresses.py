@@ -3,61 +3,43 @@ Migration script to update existing organizations, events, and vendors with addr
 
 This script will:
 1. Find all organizations/events/vendors without valid location data
-2. Allow you to provide addresses for them
-3. Geocode the addresses and update the location field
+2. With --apply, geocode the addresses already stored on them in concurrent, rate-limited
+   batches and write the locations back with bulk_write
 
 Usage:
-    python -m app.scripts.update_addresses
+    python -m app.scripts.update_addresses [--apply]
 """
 
+import argparse
 import asyncio
 
 from bson import ObjectId
+from pymongo import UpdateOne
 
 from app.database.mongodb import db
 from app.services.geocoding import geocoding_service
 
 
-async def update_organization_address(org_id: str, address: str) -> bool:
-    """Update an organization with a new address."""
-    try:
-        location = await geocoding_service.location_to_coordinates(address)
-        await db["organizations"].update_one(
-            {"_id": ObjectId(org_id)}, {"$set": {"location": location.model_dump()}}
+async def update_addresses(collection: str, addresses: dict[str, str]) -> tuple[int, list[str]]:
+    """
+    Geocode {id: address} as one batch and write the locations back with a single bulk_write.
+    Returns the number of updated documents and the IDs whose address couldn't be geocoded.
+    """
+    locations = await geocoding_service.geocode_many(addresses.values())
+    operations = []
+    failed = []
+    for entity_id, address in addresses.items():
+        location = locations.get(address.strip())
+        if location is None:
+            failed.append(entity_id)
+            continue
+        operations.append(
+            UpdateOne({"_id": ObjectId(entity_id)}, {"$set": {"location": location.model_dump()}})
         )
-        print(f"✓ Updated organization {org_id} with address: {address}")
-        return True
-    except Exception as e:
-        print(f"✗ Failed to update organization {org_id}: {str(e)}")
-        return False
-
-
-async def update_event_address(event_id: str, address: str) -> bool:
-    """Update an event with a new address."""
-    try:
-        location = await geocoding_service.location_to_coordinates(address)
-        await db["events"].update_one(
-            {"_id": ObjectId(event_id)}, {"$set": {"location": location.model_dump()}}
-        )
-        print(f"✓ Updated event {event_id} with address: {address}")
-        return True
-    except Exception as e:
-        print(f"✗ Failed to update event {event_id}: {str(e)}")
-        return False
-
-
-async def update_vendor_address(vendor_id: str, address: str) -> bool:
-    """Update a vendor with a new address."""
-    try:
-        location = await geocoding_service.location_to_coordinates(address)
-        await db["vendors"].update_one(
-            {"_id": ObjectId(vendor_id)}, {"$set": {"location": location.model_dump()}}
-        )
-        print(f"✓ Updated vendor {vendor_id} with address: {address}")
-        return True
-    except Exception as e:
-        print(f"✗ Failed to update vendor {vendor_id}: {str(e)}")
-        return False
+
+    if operations:
+        await db[collection].bulk_write(operations, ordered=False)
+    return len(operations), failed
 
 
 async def list_organizations_without_location():
@@ -128,8 +110,29 @@ async def list_vendors_without_location():
     return vendors
 
 
+async def backfill_locations(collection: str, entities: list[dict]) -> None:
+    """Geocode the stored address of each entity that has one."""
+    addresses = {str(e["_id"]): e["address"] for e in entities if e.get("address")}
+    if not addresses:
+        print(f"\nNo {collection} with a stored address to geocode")
+        return
+
+    updated, failed = await update_addresses(collection, addresses)
+    print(f"\n✓ Updated {updated} of {len(addresses)} {collection}")
+    for entity_id in failed:
+        print(f"✗ Failed to geocode {collection} {entity_id}: {addresses[entity_id]}")
+
+
 async def main():
     """Main migration function."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--apply",
+        action="store_true",
+        help="Geocode stored addresses and write the locations back",
+    )
+    args = parser.parse_args()
+
     print("=" * 60)
     print("Address Migration Script")
     print("=" * 60)
@@ -148,6 +151,14 @@ async def main():
     print(f"\n{'=' * 60}")
     print(f"Total entities needing addresses: {total}")
     print(f"{'=' * 60}")
+
+    if args.apply:
+        await backfill_locations("organizations", orgs)
+        await backfill_locations("events", events)
+        await backfill_locations("vendors", vendors)
+        return
+
+    print("\nTo geocode the addresses already stored on them, rerun with --apply.")
     print("\nTo update addresses, use the API endpoints:")
     print("  - PUT /organization/{org_id} with address field")
     print("  - PUT /event/{event_id} with address field")
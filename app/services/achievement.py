@@ -1,10 +1,14 @@
+from functools import partial
+
 from app.core.cache_constants import (
     ACHIEVEMENT_IMAGES_NAMESPACE,
     VOLUNTEER_RECEIVED_ACHIEVEMENTS_NAMESPACE,
 )
+from app.jobs.achievement import schedule_achievement_backfill
 from app.models.achievement import achievement_model
 from app.schemas.achievement import (
     Achievement,
+    CreateAchievementRequest,
     UpdateAchievementRequest,
     VolunteerReceivedAchievementResponse,
 )
@@ -28,6 +32,17 @@ class AchievementService:
             AchievementService._instance = cls()
         return AchievementService._instance
 
+    async def create_achievement(self, achievement: CreateAchievementRequest) -> Achievement:
+        created_achievement = await self.achievement_model.create_achievement(achievement)
+        await schedule_achievement_backfill(created_achievement)
+        return created_achievement
+
+    async def activate_achievement(self, achievement_id: str) -> None:
+        await self.achievement_model.activate_achievement(achievement_id)
+        await schedule_achievement_backfill(
+            await self.achievement_model.get_achievement(achievement_id)
+        )
+
     async def get_achievements_by_threshold(
         self,
         event_type: KarpEvent,
@@ -41,6 +56,17 @@ class AchievementService:
     async def get_achievements_by_volunteer(
         self,
         volunteer_id: str,
+    ) -> list[VolunteerReceivedAchievementResponse]:
+        results = await cache_service.get_or_set(
+            VOLUNTEER_RECEIVED_ACHIEVEMENTS_NAMESPACE,
+            volunteer_id,
+            partial(self._load_achievements_by_volunteer, volunteer_id),
+            expire=60 * 60 * 24,  # cache for 24 hours
+        )
+        return [VolunteerReceivedAchievementResponse(**result) for result in results]
+
+    async def _load_achievements_by_volunteer(
+        self, volunteer_id: str
     ) -> list[VolunteerReceivedAchievementResponse]:
         results = (
             await volunteer_achievements_service.get_volunteer_received_achievements_by_volunteer(
@@ -57,28 +83,25 @@ class AchievementService:
             achievement_id
         )
 
+    async def update_achievement_image(self, achievement_id: str, s3_key: str) -> str:
+        await self.achievement_model.update_achievement_image(achievement_id, s3_key)
+        await cache_service.delete(ACHIEVEMENT_IMAGES_NAMESPACE, achievement_id)
+        return s3_key
+
     async def delete_achievement(self, achievement_id: str) -> None:
-        # Invalidate caches before deleting volunteer_achievements
-        # to avoid losing affected volunteer IDs
+        await self.achievement_model.delete_achievement(achievement_id)
+        await volunteer_achievements_service._delete_all_by_achievement_id_internal(achievement_id)
         await self.invalidate_volunteer_received_achievements_caches_by_achievement_id(
             achievement_id
         )
-        await self.achievement_model.delete_achievement(achievement_id)
-        await volunteer_achievements_service._delete_all_by_achievement_id_internal(achievement_id)
         await cache_service.delete(ACHIEVEMENT_IMAGES_NAMESPACE, achievement_id)
 
     async def invalidate_volunteer_received_achievements_caches_by_achievement_id(
         self, achievement_id: str
     ) -> None:
-        volunteer_achievements = (
-            await volunteer_achievements_service.get_volunteer_achievements_by_achievement_id(
-                achievement_id
-            )
-        )
-        for volunteer_achievement in volunteer_achievements:
-            await cache_service.delete(
-                VOLUNTEER_RECEIVED_ACHIEVEMENTS_NAMESPACE, volunteer_achievement.volunteer_id
-            )
+        # Every volunteer holding the achievement embeds it in their cached response, so drop
+        # the whole namespace instead of looking up and deleting each holder's key
+        await cache_service.bump_generation(VOLUNTEER_RECEIVED_ACHIEVEMENTS_NAMESPACE)
 
 
 achievement_service = AchievementService.get_instance()
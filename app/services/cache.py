@@ -1,14 +1,77 @@
-from typing import Any
+import asyncio
+import logging
+import time
+from collections import OrderedDict, defaultdict
+from typing import TYPE_CHECKING, Any
 
 from fastapi_cache import FastAPICache
 from fastapi_cache.backends.redis import RedisBackend
+from fastapi_cache.coder import JsonCoder
+
+from app.core.cache_constants import (
+    CACHE_GENERATION_NAMESPACE,
+    LOCAL_CACHE_TTLS,
+    VERSIONED_NAMESPACES,
+)
+from app.core.config import settings
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Iterable
+
+    from redis.asyncio import Redis
+
+logger = logging.getLogger(__name__)
+
+
+class LocalCache:
+    """
+    Bounded in-process LRU keyed by (namespace, key), with a TTL per entry.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, str], tuple[float, Any]] = OrderedDict()
+
+    def get(self, namespace: str, key: str) -> tuple[bool, Any]:
+        entry = self._entries.get((namespace, key))
+        if entry is None:
+            return False, None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[(namespace, key)]
+            return False, None
+
+        self._entries.move_to_end((namespace, key))
+        return True, value
+
+    def set(self, namespace: str, key: str, value: Any, ttl: float) -> None:
+        self._entries[(namespace, key)] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end((namespace, key))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def delete(self, namespace: str, key: str) -> None:
+        self._entries.pop((namespace, key), None)
+
+    def clear_namespace(self, namespace: str) -> None:
+        for entry_key in [k for k in self._entries if k[0] == namespace]:
+            del self._entries[entry_key]
 
 
 class CacheService:
     _instance: "CacheService" = None
 
     def __init__(self):
-        pass
+        # Max keys sent in a single MGET / UNLINK / pipeline round trip
+        self.batch_size = 1000
+        self.local_cache = LocalCache(settings.LOCAL_CACHE_MAX_ENTRIES)
+        self.coder = JsonCoder
+        # Loads in progress in this process, so concurrent misses share one recomputation
+        self._inflight: dict[tuple[str, str], asyncio.Future] = {}
+        self._stats: defaultdict[str, dict[str, int]] = defaultdict(
+            lambda: {"local_hits": 0, "redis_hits": 0, "misses": 0}
+        )
 
     @classmethod
     def get_instance(cls) -> "CacheService":
@@ -19,36 +82,190 @@ class CacheService:
     def _get_backend(self) -> RedisBackend | None:
         try:
             return FastAPICache.get_backend()
-        except (RuntimeError, ValueError):
+        except (AssertionError, RuntimeError, ValueError):
+            return None
+
+    def get_redis(self) -> "Redis | None":
+        cache_backend = self._get_backend()
+        if not isinstance(cache_backend, RedisBackend):
             return None
+        return cache_backend.redis
 
     def _build_key(self, namespace: str, key: str) -> str:
         return f"{namespace}:{key}"
 
+    async def get_generation(self, namespace: str) -> int:
+        redis = self.get_redis()
+        if redis is None:
+            return 0
+        generation = await redis.get(self._build_key(CACHE_GENERATION_NAMESPACE, namespace))
+        return int(generation) if generation is not None else 0
+
+    async def bump_generation(self, namespace: str) -> None:
+        # Entries under the previous generation are never read again and age out by TTL
+        self.local_cache.clear_namespace(namespace)
+        redis = self.get_redis()
+        if redis is None:
+            return
+        await redis.incr(self._build_key(CACHE_GENERATION_NAMESPACE, namespace))
+        logger.debug(f"Bumped cache generation for namespace {namespace}")
+
+    async def resolve_namespace(self, namespace: str) -> str:
+        if namespace not in VERSIONED_NAMESPACES:
+            return namespace
+        return f"{namespace}:v{await self.get_generation(namespace)}"
+
     async def get(self, namespace: str, key: str) -> Any | None:
         cache_backend = self._get_backend()
         if cache_backend is None:
             return None
 
-        cache_key = self._build_key(namespace, key)
+        cache_key = self._build_key(await self.resolve_namespace(namespace), key)
         return await cache_backend.get(cache_key)
 
     async def set(self, namespace: str, key: str, value: Any, *, expire: int | None = None) -> None:
+        self.local_cache.delete(namespace, key)
         cache_backend = self._get_backend()
         if cache_backend is None:
             return
 
-        cache_key = self._build_key(namespace, key)
+        cache_key = self._build_key(await self.resolve_namespace(namespace), key)
         await cache_backend.set(cache_key, value, expire=expire)
 
     async def delete(self, namespace: str, key: str) -> None:
+        self.local_cache.delete(namespace, key)
         cache_backend = self._get_backend()
         if cache_backend is None:
             return
 
-        cache_key = self._build_key(namespace, key)
-        print(f"Deleting cache key: {cache_key}")
+        cache_key = self._build_key(await self.resolve_namespace(namespace), key)
+        logger.debug(f"Deleting cache key: {cache_key}")
         await cache_backend.clear(key=cache_key)
 
+    async def get_many(self, namespace: str, keys: list[str]) -> list[Any | None]:
+        cache_backend = self._get_backend()
+        if cache_backend is None or not keys:
+            return [None] * len(keys)
+
+        namespace = await self.resolve_namespace(namespace)
+        cache_keys = [self._build_key(namespace, key) for key in keys]
+        redis = self.get_redis()
+        if redis is None:
+            return [await cache_backend.get(cache_key) for cache_key in cache_keys]
+
+        values: list[Any | None] = []
+        for i in range(0, len(cache_keys), self.batch_size):
+            values.extend(await redis.mget(cache_keys[i : i + self.batch_size]))
+        return values
+
+    async def set_many(
+        self, namespace: str, values: dict[str, Any], *, expire: int | None = None
+    ) -> None:
+        for key in values:
+            self.local_cache.delete(namespace, key)
+        cache_backend = self._get_backend()
+        if cache_backend is None or not values:
+            return
+
+        namespace = await self.resolve_namespace(namespace)
+        items = [(self._build_key(namespace, key), value) for key, value in values.items()]
+        redis = self.get_redis()
+        if redis is None:
+            for cache_key, value in items:
+                await cache_backend.set(cache_key, value, expire=expire)
+            return
+
+        for i in range(0, len(items), self.batch_size):
+            async with redis.pipeline(transaction=False) as pipe:
+                for cache_key, value in items[i : i + self.batch_size]:
+                    pipe.set(cache_key, value, ex=expire)
+                await pipe.execute()
+
+    async def delete_many(self, namespace: str, keys: "Iterable[str]") -> None:
+        keys = list(keys)
+        for key in keys:
+            self.local_cache.delete(namespace, key)
+        cache_backend = self._get_backend()
+        if cache_backend is None:
+            return
+
+        namespace = await self.resolve_namespace(namespace)
+        cache_keys = list(dict.fromkeys(self._build_key(namespace, key) for key in keys))
+        if not cache_keys:
+            return
+
+        logger.debug(f"Deleting {len(cache_keys)} cache keys in namespace {namespace}")
+        redis = self.get_redis()
+        if redis is None:
+            for cache_key in cache_keys:
+                await cache_backend.clear(key=cache_key)
+            return
+
+        # UNLINK frees the values in the background instead of blocking Redis
+        for i in range(0, len(cache_keys), self.batch_size):
+            await redis.unlink(*cache_keys[i : i + self.batch_size])
+
+    async def get_or_set(
+        self,
+        namespace: str,
+        key: str,
+        loader: "Callable[[], Awaitable[Any]]",
+        *,
+        expire: int | None = None,
+    ) -> Any:
+        """
+        Return the JSON-decoded cached value for key, computing it with loader on a miss.
+        Namespaces in LOCAL_CACHE_TTLS are served from process memory first.
+        """
+        local_ttl = LOCAL_CACHE_TTLS.get(namespace)
+        if local_ttl is not None:
+            found, value = self.local_cache.get(namespace, key)
+            if found:
+                self._stats[namespace]["local_hits"] += 1
+                return value
+
+        inflight = self._inflight.get((namespace, key))
+        if inflight is None:
+            inflight = asyncio.ensure_future(self._load(namespace, key, loader, expire, local_ttl))
+            self._inflight[(namespace, key)] = inflight
+            inflight.add_done_callback(lambda _: self._inflight.pop((namespace, key), None))
+        # Shield so one cancelled caller doesn't cancel the load for everyone else waiting on it
+        return await asyncio.shield(inflight)
+
+    async def _load(
+        self,
+        namespace: str,
+        key: str,
+        loader: "Callable[[], Awaitable[Any]]",
+        expire: int | None,
+        local_ttl: int | None,
+    ) -> Any:
+        cached = await self.get(namespace, key)
+        if cached is not None:
+            self._stats[namespace]["redis_hits"] += 1
+            value = self.coder.decode(cached)
+        else:
+            self._stats[namespace]["misses"] += 1
+            encoded = self.coder.encode(await loader())
+            await self.set(namespace, key, encoded, expire=expire)
+            # Hand back the same shape a later cache hit would
+            value = self.coder.decode(encoded)
+
+        if local_ttl is not None:
+            self.local_cache.set(namespace, key, value, local_ttl)
+        return value
+
+    def get_stats(self) -> dict[str, dict[str, int | float]]:
+        stats = {}
+        for namespace, counts in self._stats.items():
+            total = sum(counts.values())
+            hits = counts["local_hits"] + counts["redis_hits"]
+            stats[namespace] = {
+                **counts,
+                "hit_ratio": hits / total if total else 0.0,
+                "local_hit_ratio": counts["local_hits"] / total if total else 0.0,
+            }
+        return stats
+
 
 cache_service = CacheService.get_instance()
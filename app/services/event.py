@@ -1,13 +1,13 @@
 import base64
 import io
 import json
-import secrets
 from datetime import timedelta
 from typing import Literal
 
 import qrcode
 from fastapi import HTTPException, status
 
+from app.core.cache_constants import QR_TOKEN_VERSION_NAMESPACE
 from app.jobs.event import (
     cancel_event_notifications,
     schedule_event_notifications,
@@ -18,7 +18,9 @@ from app.schemas.event import CreateEventRequest, Event, EventStatus, UpdateEven
 from app.schemas.location import Location
 from app.schemas.volunteer import Volunteer
 from app.services.ai import ai_service
+from app.services.cache import cache_service
 from app.services.recommendation import recommendation_service
+from app.utils.qr_token import QRTokenPurpose, create_qr_token
 
 
 class EventService:
@@ -67,6 +69,8 @@ class EventService:
         self, event_id: str, event: UpdateEventRequest, location: Location | None = None
     ) -> Event:
         updated_event = await self.event_model.update_event(event_id, event, location)
+        # Rescheduling or cancelling changes which QR tokens are accepted
+        await cache_service.delete(QR_TOKEN_VERSION_NAMESPACE, event_id)
 
         # Create notifications when event is approved
         if updated_event.status == EventStatus.APPROVED:
@@ -79,6 +83,10 @@ class EventService:
             await update_event_notifications(updated_event)
         return updated_event
 
+    async def delete_event(self, event_id: str) -> None:
+        await self.event_model.delete_event_by_id(event_id)
+        await cache_service.delete(QR_TOKEN_VERSION_NAMESPACE, event_id)
+
     # ensure that only the org who created the event can modify it
     async def authorize_org(self, event_id: str, org_id: str) -> Event | None:
         event = await self.event_model.get_event_by_id(event_id)
@@ -107,8 +115,23 @@ class EventService:
 
     async def get_event_qr_codes(self, event: Event):
         expires_at = event.end_date_time + timedelta(minutes=30)
-        check_in_qr_token = secrets.token_hex(16)
-        check_out_qr_token = secrets.token_hex(16)
+        # Each token is signed over its own check-in/check-out window and the next token
+        # version, so storing these codes revokes any generated before
+        version = event.qr_token_version + 1
+        check_in_qr_token = create_qr_token(
+            event.id,
+            QRTokenPurpose.CHECK_IN,
+            expires_at=event.start_date_time + timedelta(minutes=30),
+            not_before=event.start_date_time - timedelta(minutes=15),
+            version=version,
+        )
+        check_out_qr_token = create_qr_token(
+            event.id,
+            QRTokenPurpose.CHECK_OUT,
+            expires_at=expires_at,
+            not_before=event.end_date_time - timedelta(minutes=15),
+            version=version,
+        )
 
         check_in_payload = json.dumps(
             {
@@ -143,14 +166,23 @@ class EventService:
             check_out_buf.getvalue()
         ).decode()  # qr code image for frontend
 
-        update_event_req = UpdateEventRequest(
-            check_in_qr_code_image=check_in_qr_code,
-            check_in_qr_token=check_in_qr_token,
-            check_out_qr_code_image=check_out_qr_code,
-            check_out_qr_token=check_out_qr_token,
+        updated_event = await self.event_model.store_qr_codes(
+            event.id,
+            event.qr_token_version,
+            {
+                "check_in_qr_code_image": check_in_qr_code,
+                "check_in_qr_token": check_in_qr_token,
+                "check_out_qr_code_image": check_out_qr_code,
+                "check_out_qr_token": check_out_qr_token,
+            },
         )
-
-        return await self.event_model.update_event(event.id, update_event_req)
+        if updated_event is None:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="QR codes for this event were generated concurrently, please retry",
+            )
+        await cache_service.delete(QR_TOKEN_VERSION_NAMESPACE, event.id)
+        return updated_event
 
     async def estimate_event_difficulty(self, description: str) -> float:
         role = (
@@ -1,11 +1,15 @@
+import asyncio
 import logging
+import time
+from collections.abc import Iterable
 
 from fastapi import HTTPException, status
-from httpx import AsyncClient
+from httpx import AsyncClient, HTTPError, Limits
 
 from app.core.config import settings
 from app.schemas.geocoding import GeocodingResult
 from app.schemas.location import Location
+from app.utils import gazetteer
 
 
 class GeocodingService:
@@ -30,9 +34,63 @@ class GeocodingService:
         result = await self._geocode_internal(address)
         return result
 
-    async def location_to_coordinates(self, address: str) -> Location:
+    async def place_to_coordinates(self, city: str | None, state: str | None) -> Location:
+        """
+        Resolve a city and/or state filter. Known places come from the bundled gazetteer
+        without a network call; anything else goes to Google.
+        """
+        location = gazetteer.lookup(city, state)
+        if location is not None:
+            return location
+        address = ", ".join(part for part in (city, state) if part)
+        return await self.location_to_coordinates(address)
+
+    async def geocode_many(self, addresses: Iterable[str]) -> dict[str, Location | None]:
+        """
+        Geocode a batch of addresses for scripts and bulk imports, keyed by the stripped
+        address. Repeated addresses are geocoded once, requests share one connection pool,
+        at most GEOCODING_MAX_CONCURRENCY are in flight and they start no faster than
+        GEOCODING_MAX_QPS. Addresses that can't be geocoded map to None.
+        """
+        unique_addresses = list(dict.fromkeys(a.strip() for a in addresses if a and a.strip()))
+        concurrency = settings.GEOCODING_MAX_CONCURRENCY
+        semaphore = asyncio.Semaphore(concurrency)
+        interval = 1 / settings.GEOCODING_MAX_QPS
+        next_start = time.monotonic()
+
+        async def wait_for_slot() -> None:
+            nonlocal next_start
+            # No await between reading and advancing next_start, so each caller gets its own slot
+            now = time.monotonic()
+            delay = next_start - now
+            next_start = max(now, next_start) + interval
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+        async def geocode(client: AsyncClient, address: str) -> tuple[str, Location | None]:
+            async with semaphore:
+                await wait_for_slot()
+                try:
+                    return address, await self.location_to_coordinates(address, client)
+                except HTTPException as e:
+                    self.logger.warning("Batch geocoding failed for '%s': %s", address, e.detail)
+                except HTTPError as e:
+                    self.logger.warning("Batch geocoding request failed for '%s': %s", address, e)
+                return address, None
+
+        limits = Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        async with AsyncClient(timeout=20, limits=limits) as client:
+            results = await asyncio.gather(*(geocode(client, a) for a in unique_addresses))
+        return dict(results)
+
+    async def location_to_coordinates(
+        self, address: str, client: AsyncClient | None = None
+    ) -> Location:
         params = {"address": address, "key": settings.GOOGLE_MAPS_KEY}
-        async with AsyncClient(timeout=20) as client:
+        if client is None:
+            async with AsyncClient(timeout=20) as client:
+                r = await client.get(self.geocode_url, params=params)
+        else:
             r = await client.get(self.geocode_url, params=params)
         if r.status_code != 200:
             # Log upstream response for diagnosis (does not include secrets)
@@ -1,13 +1,13 @@
 import base64
 import io
 import json
-import secrets
 
 import qrcode
 from fastapi import HTTPException, status
 
 from app.models.item import item_model
 from app.schemas.item import Item, UpdateItemRequest
+from app.utils.qr_token import QRTokenPurpose, create_qr_token
 
 
 class ItemService:
@@ -44,7 +44,7 @@ class ItemService:
 
     async def get_item_qr_code(self, item: Item):
         expires_at = item.expiration
-        qr_token = secrets.token_hex(16)
+        qr_token = create_qr_token(item.id, QRTokenPurpose.ITEM_REDEMPTION, expires_at=expires_at)
 
         qr_payload = json.dumps(
             {
@@ -0,0 +1,145 @@
+import logging
+
+from app.core.cache_constants import VOLUNTEER_LEADERBOARD_KEY
+from app.models.volunteer import volunteer_model
+from app.schemas.volunteer import Volunteer, VolunteerRankResponse
+from app.services.cache import cache_service
+
+logger = logging.getLogger(__name__)
+
+STAGING_KEY = f"{VOLUNTEER_LEADERBOARD_KEY}:rebuild"
+# Scores set and members removed since the last rebuild started, replayed after the swap
+CHANGES_KEY = f"{VOLUNTEER_LEADERBOARD_KEY}:changes"
+REMOVED_KEY = f"{VOLUNTEER_LEADERBOARD_KEY}:removed"
+
+SWAP_SCRIPT = """
+local live, staging, changes, removed = KEYS[1], KEYS[2], KEYS[3], KEYS[4]
+if redis.call('EXISTS', staging) == 1 then
+    redis.call('RENAME', staging, live)
+else
+    redis.call('DEL', live)
+end
+local entries = redis.call('ZRANGE', changes, 0, -1, 'WITHSCORES')
+for i = 1, #entries, 2 do
+    redis.call('ZADD', live, entries[i + 1], entries[i])
+end
+for _, member in ipairs(redis.call('SMEMBERS', removed)) do
+    redis.call('ZREM', live, member)
+end
+redis.call('DEL', changes, removed)
+return redis.call('ZCARD', live)
+"""
+
+
+class LeaderboardService:
+    """
+    Volunteer experience leaderboard kept in a Redis sorted set, so top-N and rank
+    lookups are O(log N) instead of sorting the volunteers collection.
+    """
+
+    _instance: "LeaderboardService" = None
+
+    def __init__(self, volunteer_model=volunteer_model):
+        if LeaderboardService._instance is not None:
+            raise Exception("This class is a singleton!")
+        self.volunteer_model = volunteer_model
+        self.rebuild_batch_size = 1000
+
+    @classmethod
+    def get_instance(cls) -> "LeaderboardService":
+        if LeaderboardService._instance is None:
+            LeaderboardService._instance = cls()
+        return LeaderboardService._instance
+
+    async def record_experience(self, volunteer_id: str, experience: int) -> None:
+        await self.record_experiences({volunteer_id: experience})
+
+    async def record_experiences(self, experiences: dict[str, int]) -> None:
+        redis = cache_service.get_redis()
+        if redis is None or not experiences:
+            return
+        # Experience only grows, so GT keeps an out-of-order write from lowering the score
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.zadd(VOLUNTEER_LEADERBOARD_KEY, experiences, gt=True)
+            pipe.zadd(CHANGES_KEY, experiences, gt=True)
+            pipe.srem(REMOVED_KEY, *experiences)
+            await pipe.execute()
+
+    async def set_experience(self, volunteer_id: str, experience: int) -> None:
+        redis = cache_service.get_redis()
+        if redis is None:
+            return
+        # Direct edits may lower experience, so overwrite the score instead of using GT
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.zadd(VOLUNTEER_LEADERBOARD_KEY, {volunteer_id: experience})
+            pipe.zadd(CHANGES_KEY, {volunteer_id: experience})
+            pipe.srem(REMOVED_KEY, volunteer_id)
+            await pipe.execute()
+
+    async def add_volunteer(self, volunteer_id: str) -> None:
+        redis = cache_service.get_redis()
+        if redis is None:
+            return
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.zadd(VOLUNTEER_LEADERBOARD_KEY, {volunteer_id: 0}, nx=True)
+            pipe.zadd(CHANGES_KEY, {volunteer_id: 0}, nx=True)
+            pipe.srem(REMOVED_KEY, volunteer_id)
+            await pipe.execute()
+
+    async def remove_volunteer(self, volunteer_id: str) -> None:
+        redis = cache_service.get_redis()
+        if redis is None:
+            return
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.zrem(VOLUNTEER_LEADERBOARD_KEY, volunteer_id)
+            pipe.zrem(CHANGES_KEY, volunteer_id)
+            pipe.sadd(REMOVED_KEY, volunteer_id)
+            await pipe.execute()
+
+    async def get_top_volunteers(self, limit: int) -> list[Volunteer]:
+        redis = cache_service.get_redis()
+        if redis is None or not await redis.exists(VOLUNTEER_LEADERBOARD_KEY):
+            return await self.volunteer_model.get_top_x_volunteers(limit)
+
+        volunteer_ids = await redis.zrevrange(VOLUNTEER_LEADERBOARD_KEY, 0, limit - 1)
+        return await self.volunteer_model.get_volunteers_by_ids(
+            [volunteer_id.decode() for volunteer_id in volunteer_ids]
+        )
+
+    async def get_rank(self, volunteer_id: str) -> VolunteerRankResponse | None:
+        redis = cache_service.get_redis()
+        if redis is None:
+            return None
+
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.zrevrank(VOLUNTEER_LEADERBOARD_KEY, volunteer_id)
+            pipe.zscore(VOLUNTEER_LEADERBOARD_KEY, volunteer_id)
+            pipe.zcard(VOLUNTEER_LEADERBOARD_KEY)
+            rank, experience, total = await pipe.execute()
+
+        if rank is None:
+            return None
+        return VolunteerRankResponse(rank=rank + 1, experience=int(experience), total=total)
+
+    async def rebuild(self) -> None:
+        redis = cache_service.get_redis()
+        if redis is None:
+            return
+
+        # Writes from here on are also logged to the change keys. Anything written before
+        # this point is already in Mongo and is picked up by the scan below.
+        await redis.delete(STAGING_KEY, CHANGES_KEY, REMOVED_KEY)
+        count = 0
+        async for batch in self.volunteer_model.iter_experience(self.rebuild_batch_size):
+            await redis.zadd(STAGING_KEY, batch)
+            count += len(batch)
+
+        # Swap the rebuilt board in and replay the changes logged during the scan, in one
+        # script so no write can land between the two
+        total = await redis.eval(
+            SWAP_SCRIPT, 4, VOLUNTEER_LEADERBOARD_KEY, STAGING_KEY, CHANGES_KEY, REMOVED_KEY
+        )
+        logger.info(f"Rebuilt volunteer leaderboard with {count} volunteers ({total} after replay)")
+
+
+leaderboard_service = LeaderboardService.get_instance()
@@ -0,0 +1,81 @@
+import asyncio
+from functools import partial
+from typing import TYPE_CHECKING
+
+from fastapi import HTTPException, status
+
+from app.core.cache_constants import MAP_CLUSTERS_NAMESPACE
+from app.schemas.map import MapCluster, MapClusterResponse
+from app.services.cache import cache_service
+from app.utils.map_tiles import MAX_TILES_PER_REQUEST, tiles_for_bbox
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
+
+class MapClusterService:
+    """
+    Serves map markers as grid clusters. A bounding box is split into fixed tiles so each
+    tile's clusters can be cached and shared between viewports that overlap it.
+    """
+
+    _instance: "MapClusterService" = None
+
+    def __init__(self):
+        if MapClusterService._instance is not None:
+            raise Exception("This class is a singleton!")
+        self.tile_expire_seconds = 60
+
+    @classmethod
+    def get_instance(cls) -> "MapClusterService":
+        if MapClusterService._instance is None:
+            MapClusterService._instance = cls()
+        return MapClusterService._instance
+
+    async def get_clusters(
+        self,
+        entity: str,
+        load_tile: "Callable[[int, int, int], Awaitable[list[dict]]]",
+        west: float,
+        south: float,
+        east: float,
+        north: float,
+        zoom: int,
+    ) -> MapClusterResponse:
+        if south > north:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="south must not be above north"
+            )
+
+        tiles = tiles_for_bbox(west, south, east, north, zoom)
+        if len(tiles) > MAX_TILES_PER_REQUEST:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Bounding box is too large for this zoom level",
+            )
+
+        # One MGET for every tile in view; only the misses are loaded, single-flight
+        keys = [f"{entity}:{zoom}:{x}:{y}" for x, y in tiles]
+        cached = await cache_service.get_many(MAP_CLUSTERS_NAMESPACE, keys)
+        missing = [i for i, value in enumerate(cached) if value is None]
+        loaded = await asyncio.gather(
+            *(
+                cache_service.get_or_set(
+                    MAP_CLUSTERS_NAMESPACE,
+                    keys[i],
+                    partial(load_tile, *tiles[i], zoom),
+                    expire=self.tile_expire_seconds,
+                )
+                for i in missing
+            )
+        )
+        tile_clusters = [
+            cache_service.coder.decode(value) if value is not None else None for value in cached
+        ]
+        for i, clusters in zip(missing, loaded, strict=True):
+            tile_clusters[i] = clusters
+        clusters = [MapCluster(**cluster) for tile in tile_clusters for cluster in tile]
+        return MapClusterResponse(zoom=zoom, clusters=clusters)
+
+
+map_cluster_service = MapClusterService.get_instance()
@@ -1,11 +1,14 @@
+import logging
+
 from fastapi import HTTPException, status
 
 from app.models.item import item_model
 from app.models.order import order_model
 from app.models.volunteer import volunteer_model
-from app.schemas.order import Order
+from app.schemas.order import CreateOrderRequest, Order
 from app.schemas.user import User, UserType
-from app.schemas.volunteer import UpdateVolunteerRequest
+
+logger = logging.getLogger(__name__)
 
 
 class OrderService:
@@ -44,28 +47,30 @@ class OrderService:
 
         return order
 
-    async def validate_and_process_order(self, item_id: str, volunteer_id: str) -> None:
-        item = await self.item_model.get_item_by_id(item_id)
+    async def place_order(self, order: CreateOrderRequest, volunteer_id: str) -> Order:
+        item = await self.item_model.get_item_by_id(order.item_id)
         if not item:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Item not found")
 
-        # Get the volunteer to check their coins
-        volunteer = await volunteer_model.get_volunteer_by_id(volunteer_id)
-        if not volunteer:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Volunteer not found")
-
-        # Check if volunteer has enough coins
-        if volunteer.coins < item.price:
+        if not await volunteer_model.deduct_coins(volunteer_id, item.price):
+            # Only read the volunteer back to explain a failed deduction
+            volunteer = await volunteer_model.get_volunteer_by_id(volunteer_id)
+            if not volunteer:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND, detail="Volunteer not found"
+                )
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Insufficient coins. Required: {item.price}, Available: {volunteer.coins}",
             )
 
-        # Deduct coins from volunteer
-        new_coin_balance = volunteer.coins - item.price
-        await volunteer_model.update_volunteer(
-            volunteer_id, UpdateVolunteerRequest(coins=new_coin_balance)
-        )
+        try:
+            return await self.order_model.create_order(order, volunteer_id)
+        except Exception:
+            # Compensate so a failed insert doesn't leave the volunteer charged
+            logger.exception(f"Failed to create order for volunteer {volunteer_id}, refunding")
+            await volunteer_model.refund_coins(volunteer_id, item.price)
+            raise
 
 
 order_service = OrderService.get_instance()
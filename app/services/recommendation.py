@@ -147,17 +147,7 @@ class RecommendationService:
         if event.status != Status.PUBLISHED:
             return False
 
-        registrations = await registration_model.registrations.find(
-            {"event_id": ObjectId(event.id)}
-        ).to_list(length=None)
-
-        active_registrations = [
-            r
-            for r in registrations
-            if r.get("registration_status") != RegistrationStatus.UNREGISTERED
-        ]
-
-        if len(active_registrations) >= event.max_volunteers:
+        if event.registered_count >= event.max_volunteers:
             return False
 
         return True
@@ -218,18 +208,8 @@ class RecommendationService:
                     if not await self.is_event_available(event, registered_event_ids):
                         continue
 
-                    registrations = await registration_model.registrations.find(
-                        {"event_id": ObjectId(event.id)}
-                    ).to_list(length=None)
-
-                    active_registrations = [
-                        r
-                        for r in registrations
-                        if r.get("registration_status") != RegistrationStatus.UNREGISTERED
-                    ]
-
                     popularity_score = (
-                        len(active_registrations) / event.max_volunteers
+                        event.registered_count / event.max_volunteers
                         if event.max_volunteers > 0
                         else 0
                     )
@@ -259,17 +239,7 @@ class RecommendationService:
             if event.id in registered_event_ids:
                 continue
 
-            registrations = await registration_model.registrations.find(
-                {"event_id": ObjectId(event.id)}
-            ).to_list(length=None)
-
-            active_registrations = [
-                r
-                for r in registrations
-                if r.get("registration_status") != RegistrationStatus.UNREGISTERED
-            ]
-
-            if len(active_registrations) >= event.max_volunteers:
+            if event.registered_count >= event.max_volunteers:
                 continue
 
             if completed_event_ids:
@@ -282,9 +252,7 @@ class RecommendationService:
                 final_score = self.compute_content_score(event, volunteer.preferences)
             else:
                 popularity_score = (
-                    len(active_registrations) / event.max_volunteers
-                    if event.max_volunteers > 0
-                    else 0
+                    event.registered_count / event.max_volunteers if event.max_volunteers > 0 else 0
                 )
                 final_score = popularity_score
 
@@ -1,6 +1,24 @@
-from datetime import datetime
+from datetime import UTC, datetime, timedelta
 
+from bson import ObjectId
+from fastapi import HTTPException, status
+
+from app.core.cache_constants import QR_TOKEN_VERSION_NAMESPACE, QR_TOKEN_VERSION_TTL_SECONDS
+from app.models.event import event_model
 from app.models.registration import registration_model
+from app.schemas.event import Event, EventStatus
+from app.schemas.registration import BulkScanRequest, ScanResult, ScanType
+from app.schemas.user import User, UserType
+from app.services.cache import cache_service
+from app.services.volunteer import volunteer_service
+from app.utils.qr_token import (
+    REVOKED_QR_TOKEN_VERSION,
+    QRTokenCheck,
+    QRTokenPurpose,
+    check_qr_token,
+    is_signed_qr_token,
+    read_qr_token_version,
+)
 
 
 class RegistrationService:
@@ -10,6 +28,8 @@ class RegistrationService:
         if RegistrationService._instance is not None:
             raise Exception("This class is a singleton!")
         self.registration_model = registration_model
+        # How far in the future a device clock may report a scan
+        self.max_clock_skew = timedelta(minutes=5)
 
     @classmethod
     def get_instance(cls) -> "RegistrationService":
@@ -17,14 +37,177 @@ class RegistrationService:
             RegistrationService._instance = cls()
         return RegistrationService._instance
 
+    async def validate_scan(
+        self, event_id: str, qr_token: str, purpose: QRTokenPurpose, error_status: int
+    ) -> Event | None:
+        """
+        Check a volunteer's own scan before anything is written. Signed tokens carry their
+        version and check-in/check-out window, so they are checked against the cached token
+        version without reading the event. Tokens generated before signing was introduced
+        are compared with the stored token, which needs the event; it is returned so
+        callers can reuse it.
+        """
+        event = None
+        if is_signed_qr_token(qr_token):
+            version = await self.get_qr_token_version(event_id, read_qr_token_version(qr_token))
+            if version is None:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Event not found")
+        else:
+            event = await event_model.get_event_by_id(event_id)
+            version = _get_qr_token_version(event)
+
+        detail = _get_scan_error(event_id, qr_token, purpose, datetime.now(UTC), version, event)
+        if detail:
+            raise HTTPException(status_code=error_status, detail=detail)
+        return event
+
+    async def get_qr_token_version(self, event_id: str, token_version: int | None) -> int | None:
+        version = await self._get_cached_qr_token_version(event_id)
+        if version in (None, REVOKED_QR_TOKEN_VERSION) or (token_version or 0) <= version:
+            return version
+        # The codes may have just been regenerated by another worker, so reload once
+        await cache_service.delete(QR_TOKEN_VERSION_NAMESPACE, event_id)
+        return await self._get_cached_qr_token_version(event_id)
+
+    async def _get_cached_qr_token_version(self, event_id: str) -> int | None:
+        return await cache_service.get_or_set(
+            QR_TOKEN_VERSION_NAMESPACE,
+            event_id,
+            lambda: event_model.get_qr_token_version(event_id),
+            expire=QR_TOKEN_VERSION_TTL_SECONDS,
+        )
+
+    async def apply_bulk_scans(
+        self, event_id: str, request: BulkScanRequest, current_user: User
+    ) -> list[ScanResult]:
+        """
+        Apply a batch of check-in or check-out scans collected by an organizer device.
+        The event is loaded and validated once, every accepted scan is written in one bulk
+        write, and check-out rewards are granted in bulk.
+        """
+        event = await event_model.get_event_by_id(event_id)
+        if not event:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Event not found")
+
+        is_admin = current_user.user_type == UserType.ADMIN
+        if not is_admin and event.organization_id != current_user.entity_id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You do not have permission to check volunteers into this event",
+            )
+
+        if request.scan_type == ScanType.CHECK_IN:
+            purpose = QRTokenPurpose.CHECK_IN
+        else:
+            purpose = QRTokenPurpose.CHECK_OUT
+        version = _get_qr_token_version(event)
+        latest_allowed = datetime.now(UTC) + self.max_clock_skew
+
+        results: dict[str, ScanResult] = {}
+        accepted: dict[str, datetime] = {}
+        for scan in request.scans:
+            # The first scan for a volunteer wins
+            if scan.volunteer_id in results:
+                continue
+
+            scanned_at = _ensure_timezone_aware(scan.scanned_at)
+            if not ObjectId.is_valid(scan.volunteer_id):
+                detail = "Invalid volunteer ID"
+            elif scanned_at > latest_allowed:
+                detail = "Scan is outside the allowed time for this Event"
+            else:
+                # Same checks as the single endpoints, applied at the scan time
+                detail = _get_scan_error(
+                    event_id, scan.qr_token, purpose, scanned_at, version, event
+                )
+            if detail is None:
+                accepted[scan.volunteer_id] = _to_stored_time(scanned_at)
+
+            results[scan.volunteer_id] = ScanResult(
+                volunteer_id=scan.volunteer_id, applied=False, detail=detail
+            )
+
+        if request.scan_type == ScanType.CHECK_IN:
+            applied = await self.registration_model.bulk_check_in(event_id, accepted)
+            rejected_detail = "Volunteer did not sign up for this event or has already checked in"
+        else:
+            applied = await self.registration_model.bulk_check_out(event_id, accepted)
+            rejected_detail = "Volunteer did not sign up for this event or has already checked out"
+            await volunteer_service.handle_bulk_checkout_rewards(applied, event)
+
+        applied_ids = {registration.volunteer_id for registration in applied}
+        for volunteer_id in accepted:
+            if volunteer_id in applied_ids:
+                results[volunteer_id].applied = True
+            else:
+                results[volunteer_id].detail = rejected_detail
+
+        return list(results.values())
+
     async def update_not_checked_out_volunteers(self, event_id: str) -> None:
         volunteers = await self.registration_model.get_volunteers_by_event(event_id)
         for volunteer in volunteers:
             if volunteer["clocked_out"] is None:
-                volunteer["clocked_out"] = datetime.now()
+                volunteer["clocked_out"] = datetime.now(UTC)
                 await self.registration_model.update_registration(
                     volunteer["id"], {"clocked_out": volunteer["clocked_out"]}
                 )
 
 
+def _get_qr_token_version(event: Event) -> int:
+    if event.status == EventStatus.CANCELLED:
+        return REVOKED_QR_TOKEN_VERSION
+    return event.qr_token_version
+
+
+def _get_scan_error(
+    event_id: str,
+    qr_token: str,
+    purpose: QRTokenPurpose,
+    scanned_at: datetime,
+    version: int,
+    event: Event | None = None,
+) -> str | None:
+    """
+    Why a check-in or check-out scan is rejected, or None if it is accepted. Used by the
+    single and bulk endpoints alike. `event` is only needed for unsigned tokens.
+    """
+    action = "check in" if purpose == QRTokenPurpose.CHECK_IN else "check out"
+    outside_window = f"You can't {action} for this Event as this time."
+    if version == REVOKED_QR_TOKEN_VERSION:
+        return "This Event has been cancelled"
+
+    if is_signed_qr_token(qr_token):
+        result = check_qr_token(qr_token, event_id, purpose, at=scanned_at, version=version)
+        if result == QRTokenCheck.INVALID:
+            return "Invalid QR Code for Event"
+        return outside_window if result == QRTokenCheck.OUTSIDE_WINDOW else None
+
+    if purpose == QRTokenPurpose.CHECK_IN:
+        expected_token, window_anchor = event.check_in_qr_token, event.start_date_time
+    else:
+        expected_token, window_anchor = event.check_out_qr_token, event.end_date_time
+    if expected_token is None or expected_token != qr_token:
+        return "Invalid QR Code for Event"
+
+    window_anchor = _ensure_timezone_aware(window_anchor)
+    window_start = window_anchor - timedelta(minutes=15)
+    window_end = window_anchor + timedelta(minutes=30)
+    if not window_start <= scanned_at <= window_end:
+        return outside_window
+    return None
+
+
+def _ensure_timezone_aware(dt: datetime) -> datetime:
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=UTC)
+    return dt
+
+
+def _to_stored_time(dt: datetime) -> datetime:
+    # Mongo keeps naive UTC datetimes at millisecond precision
+    dt = dt.astimezone(UTC).replace(tzinfo=None)
+    return dt.replace(microsecond=dt.microsecond // 1000 * 1000)
+
+
 registration_service = RegistrationService.get_instance()
@@ -0,0 +1,154 @@
+import asyncio
+import json
+import logging
+import time
+
+from app.core.cache_constants import TOKEN_BLACKLIST_CHANNEL, TOKEN_BLACKLIST_NAMESPACE
+from app.services.cache import cache_service
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBlacklistService:
+    """
+    Per-process set of revoked token hashes, seeded from Redis on startup and kept in sync
+    across workers through Redis pub/sub. Redis is only consulted on a local hit.
+    """
+
+    _instance: "TokenBlacklistService" = None
+
+    def __init__(self):
+        if TokenBlacklistService._instance is not None:
+            raise Exception("This class is a singleton!")
+        # token hash -> unix timestamp at which the blacklist entry expires
+        self._revoked: dict[str, float] = {}
+        self._listener_task: asyncio.Task | None = None
+        self._seeded = asyncio.Event()
+        self.reconnect_delay_seconds = 5
+        self.startup_timeout_seconds = 5
+
+    @classmethod
+    def get_instance(cls) -> "TokenBlacklistService":
+        if TokenBlacklistService._instance is None:
+            TokenBlacklistService._instance = cls()
+        return TokenBlacklistService._instance
+
+    async def start(self) -> None:
+        if self._listener_task is None:
+            self._listener_task = asyncio.create_task(self._listen())
+            # Don't serve requests with an empty set if Redis is reachable
+            try:
+                await asyncio.wait_for(self._seeded.wait(), timeout=self.startup_timeout_seconds)
+            except TimeoutError:
+                logger.warning("Token blacklist was not seeded before startup timeout")
+
+    async def stop(self) -> None:
+        if self._listener_task is not None:
+            self._listener_task.cancel()
+            try:
+                await self._listener_task
+            except asyncio.CancelledError:
+                pass
+            self._listener_task = None
+
+    async def revoke(self, token_hash: str, expire: int) -> None:
+        expires_at = time.time() + expire
+        self._prune()
+        self._add(token_hash, expires_at)
+
+        # Store a simple marker value (string) to avoid Redis serialization errors
+        await cache_service.set(TOKEN_BLACKLIST_NAMESPACE, token_hash, "1", expire=expire)
+
+        redis = cache_service.get_redis()
+        if redis is not None:
+            message = json.dumps({"token_hash": token_hash, "expires_at": expires_at})
+            await redis.publish(TOKEN_BLACKLIST_CHANNEL, message)
+
+    async def is_revoked(self, token_hash: str) -> bool:
+        expires_at = self._revoked.get(token_hash)
+        if expires_at is None:
+            return False
+
+        if expires_at <= time.time():
+            self._revoked.pop(token_hash, None)
+            return False
+
+        # Local hit, confirm against Redis
+        if cache_service.get_redis() is None:
+            return True
+        if await cache_service.get(TOKEN_BLACKLIST_NAMESPACE, token_hash):
+            return True
+
+        self._revoked.pop(token_hash, None)
+        return False
+
+    def _add(self, token_hash: str, expires_at: float) -> None:
+        self._revoked[token_hash] = expires_at
+
+    def _prune(self) -> None:
+        now = time.time()
+        expired = [h for h, expires_at in self._revoked.items() if expires_at <= now]
+        for token_hash in expired:
+            del self._revoked[token_hash]
+
+    async def _seed(self) -> None:
+        redis = cache_service.get_redis()
+        if redis is None:
+            return
+
+        prefix = f"{TOKEN_BLACKLIST_NAMESPACE}:"
+        keys = [key async for key in redis.scan_iter(match=f"{prefix}*", count=1000)]
+        if not keys:
+            return
+
+        async with redis.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.ttl(key)
+            ttls = await pipe.execute()
+
+        now = time.time()
+        for key, ttl in zip(keys, ttls, strict=True):
+            if ttl is None or ttl == -2:
+                continue
+            key = key.decode() if isinstance(key, bytes) else key
+            # Keys without a TTL never expire on their own; keep them until Redis says otherwise
+            expires_at = now + ttl if ttl >= 0 else float("inf")
+            self._add(key[len(prefix) :], expires_at)
+
+        logger.info(f"Seeded token blacklist with {len(self._revoked)} revoked tokens")
+
+    def _handle_message(self, data: bytes | str) -> None:
+        try:
+            message = json.loads(data)
+            self._prune()
+            self._add(message["token_hash"], float(message["expires_at"]))
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring malformed token blacklist message: {e}")
+
+    async def _listen(self) -> None:
+        while True:
+            redis = cache_service.get_redis()
+            if redis is None:
+                await asyncio.sleep(self.reconnect_delay_seconds)
+                continue
+
+            pubsub = redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                # Subscribe before seeding so revocations published in between are not lost
+                await pubsub.subscribe(TOKEN_BLACKLIST_CHANNEL)
+                self._prune()
+                await self._seed()
+                self._seeded.set()
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self._handle_message(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Token blacklist subscription failed, reconnecting: {e}")
+                await asyncio.sleep(self.reconnect_delay_seconds)
+            finally:
+                await pubsub.aclose()
+
+
+token_blacklist_service = TokenBlacklistService.get_instance()
@@ -1,15 +1,24 @@
-import traceback
+import logging
+from bisect import bisect_left
+
+from fastapi import HTTPException
+from pymongo.errors import PyMongoError
+from redis.exceptions import RedisError
 
 from app.core.cache_constants import VOLUNTEER_RECEIVED_ACHIEVEMENTS_NAMESPACE
 from app.models.volunteer import volunteer_model
+from app.models.volunteer_organization_hours import volunteer_organization_hours_model
 from app.schemas.event import Event
 from app.schemas.karp_event import KarpEvent
 from app.schemas.registration import Registration
-from app.schemas.volunteer import UpdateVolunteerRequest, Volunteer
+from app.schemas.volunteer import Volunteer
 from app.services.achievement import achievement_service
 from app.services.cache import cache_service
+from app.services.leaderboard import leaderboard_service
 from app.services.volunteer_achievements import volunteer_achievements_service
 
+logger = logging.getLogger(__name__)
+
 
 class VolunteerService:
     _instance: "VolunteerService" = None
@@ -27,6 +36,7 @@ class VolunteerService:
         self.base_xp = 100
         self.growth_factor = 1.75
         self.level_dict = self.create_level_to_xp_dict()
+        self._level_max_xps = list(self.level_dict.values())
 
     @classmethod
     def get_instance(cls) -> "VolunteerService":
@@ -34,17 +44,17 @@ class VolunteerService:
             VolunteerService._instance = cls()
         return VolunteerService._instance
 
+    def get_level_for_experience(self, experience: int) -> int:
+        # First level whose max xp covers the experience, capped at the top level
+        index = bisect_left(self._level_max_xps, experience)
+        return min(index + 1, len(self._level_max_xps))
+
     async def check_level_up(self, volunteer: Volunteer) -> None:
-        current_exp = volunteer.experience
-        for level, max_xp in self.level_dict.items():
-            if current_exp <= max_xp:
-                new_level = level
-                break
+        new_level = self.get_level_for_experience(volunteer.experience)
 
-        if new_level != volunteer.current_level:
+        if new_level > volunteer.current_level:
             old_level = volunteer.current_level
-            update_volunteer_req = UpdateVolunteerRequest(current_level=new_level)
-            await self.volunteer_model.update_volunteer(volunteer.id, update_volunteer_req)
+            await self.volunteer_model.raise_level(volunteer.id, new_level)
 
             # grant achievements for (old_level + 1) to new_level inclusive
             await self.check_and_grant_achievement(
@@ -71,11 +81,10 @@ class VolunteerService:
         achievements = await achievement_service.get_achievements_by_threshold(
             event_type, threshold_min, threshold_max
         )
-        for achievement in achievements:
-            await volunteer_achievements_service._add_achievement_to_volunteer_internal(
-                volunteer_id, achievement.id
-            )
-        if achievements:
+        granted = await volunteer_achievements_service._grant_achievements_to_volunteer_internal(
+            volunteer_id, [achievement.id for achievement in achievements]
+        )
+        if granted:
             await cache_service.delete(VOLUNTEER_RECEIVED_ACHIEVEMENTS_NAMESPACE, volunteer_id)
 
     def create_level_to_xp_dict(self):
@@ -101,28 +110,54 @@ class VolunteerService:
     #             required_for_next = self.base_xp
     #     return level
 
-    # TODO: verify this logic
     async def handle_volunteer_checkout_rewards(
-        self, registration: Registration, volunteer_id: str, event: Event, volunteer: Volunteer
+        self, registration: Registration, volunteer_id: str, event: Event
     ) -> None:
         try:
             if registration.clocked_in and registration.clocked_out:
-                print("prev experience:", volunteer.experience)
-                new_experience = volunteer.experience + event.coins
-                print("new experience:", new_experience)
-                print("prev coins:", volunteer.coins)
-                new_coins = volunteer.coins + event.coins
-                print("new coins", new_coins)
-                update_volunteer_req = UpdateVolunteerRequest(
-                    experience=new_experience, coins=new_coins
+                # Increment atomically so concurrent checkouts can't overwrite each other
+                volunteer = await self.volunteer_model.increment_rewards(
+                    volunteer_id, experience=event.coins, coins=event.coins
                 )
-                volunteer = await self.volunteer_model.update_volunteer(
-                    volunteer_id, update_volunteer_req
+                if volunteer:
+                    await leaderboard_service.record_experience(volunteer.id, volunteer.experience)
+                    await self.check_level_up(volunteer)
+
+                await volunteer_organization_hours_model.record_completion(
+                    volunteer_id, event.organization_id, self._get_event_minutes(event)
                 )
+        except (PyMongoError, RedisError, HTTPException):
+            logger.exception(f"Error handling checkout rewards for volunteer {volunteer_id}")
+
+    async def handle_bulk_checkout_rewards(
+        self, registrations: list[Registration], event: Event
+    ) -> None:
+        volunteer_ids = [
+            registration.volunteer_id
+            for registration in registrations
+            if registration.clocked_in and registration.clocked_out
+        ]
+        if not volunteer_ids:
+            return
+
+        try:
+            volunteers = await self.volunteer_model.bulk_increment_rewards(
+                volunteer_ids, experience=event.coins, coins=event.coins
+            )
+            await leaderboard_service.record_experiences(
+                {volunteer.id: volunteer.experience for volunteer in volunteers}
+            )
+            for volunteer in volunteers:
                 await self.check_level_up(volunteer)
-        except Exception:
-            print("Error handling volunteer checkout rewards")
-            traceback.print_exc()
+
+            await volunteer_organization_hours_model.record_completions(
+                volunteer_ids, event.organization_id, self._get_event_minutes(event)
+            )
+        except (PyMongoError, RedisError, HTTPException):
+            logger.exception(f"Error handling bulk checkout rewards for event {event.id}")
+
+    def _get_event_minutes(self, event: Event) -> int:
+        return int((event.end_date_time - event.start_date_time).total_seconds() // 60)
 
 
 volunteer_service = VolunteerService.get_instance()
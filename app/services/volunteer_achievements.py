@@ -1,3 +1,5 @@
+from datetime import UTC, datetime
+
 from app.core.cache_constants import VOLUNTEER_RECEIVED_ACHIEVEMENTS_NAMESPACE
 from app.models.achievement import achievement_model
 from app.models.volunteer_achievement import (
@@ -50,19 +52,12 @@ class VolunteerAchievementsService:
             )
         )
 
-    # Internal method to add an achievement to a volunteer, no cache invalidation
-    async def _add_achievement_to_volunteer_internal(self, volunteer_id: str, achievement_id: str):
-        existing_achievements = (
-            await self.volunteer_achievement_model.get_volunteer_achievements_by_volunteer(
-                volunteer_id
-            )
-        )
-        if achievement_id in [achievement.achievement_id for achievement in existing_achievements]:
-            return
-        return await self.volunteer_achievement_model.create_volunteer_achievement(
-            CreateVolunteerAchievementRequest(
-                volunteer_id=volunteer_id, achievement_id=achievement_id
-            )
+    # Internal method to grant achievements to a volunteer, no cache invalidation
+    async def _grant_achievements_to_volunteer_internal(
+        self, volunteer_id: str, achievement_ids: list[str]
+    ) -> int:
+        return await self.volunteer_achievement_model.grant_achievements(
+            volunteer_id, achievement_ids, datetime.now(UTC)
         )
 
     async def get_volunteer_received_achievements_by_volunteer(
@@ -0,0 +1,164 @@
+"""
+Offline lookup for the US cities and states used by location filters.
+
+app/data/us_places.txt is generated from us_places.csv by app.scripts.build_gazetteer. Each
+line is a fixed-width record: a normalized "city|st" key (empty city for a whole state)
+padded to KEY_WIDTH, then latitude and longitude. Records are sorted by key, so a lookup is
+a binary search over the memory-mapped file and nothing is parsed up front.
+"""
+
+import logging
+import mmap
+from functools import cache
+from pathlib import Path
+
+from app.schemas.location import Location
+
+logger = logging.getLogger(__name__)
+
+GAZETTEER_PATH = Path(__file__).resolve().parent.parent / "data" / "us_places.txt"
+KEY_WIDTH = 24
+COORDINATE_WIDTH = 10
+RECORD_SIZE = KEY_WIDTH + 2 * COORDINATE_WIDTH + 1
+
+STATE_CODES = {
+    "alabama": "AL",
+    "alaska": "AK",
+    "arizona": "AZ",
+    "arkansas": "AR",
+    "california": "CA",
+    "colorado": "CO",
+    "connecticut": "CT",
+    "delaware": "DE",
+    "district of columbia": "DC",
+    "florida": "FL",
+    "georgia": "GA",
+    "hawaii": "HI",
+    "idaho": "ID",
+    "illinois": "IL",
+    "indiana": "IN",
+    "iowa": "IA",
+    "kansas": "KS",
+    "kentucky": "KY",
+    "louisiana": "LA",
+    "maine": "ME",
+    "maryland": "MD",
+    "massachusetts": "MA",
+    "michigan": "MI",
+    "minnesota": "MN",
+    "mississippi": "MS",
+    "missouri": "MO",
+    "montana": "MT",
+    "nebraska": "NE",
+    "nevada": "NV",
+    "new hampshire": "NH",
+    "new jersey": "NJ",
+    "new mexico": "NM",
+    "new york": "NY",
+    "north carolina": "NC",
+    "north dakota": "ND",
+    "ohio": "OH",
+    "oklahoma": "OK",
+    "oregon": "OR",
+    "pennsylvania": "PA",
+    "puerto rico": "PR",
+    "rhode island": "RI",
+    "south carolina": "SC",
+    "south dakota": "SD",
+    "tennessee": "TN",
+    "texas": "TX",
+    "utah": "UT",
+    "vermont": "VT",
+    "virginia": "VA",
+    "washington": "WA",
+    "west virginia": "WV",
+    "wisconsin": "WI",
+    "wyoming": "WY",
+}
+
+
+def normalize_city(city: str) -> str:
+    # "St. Louis", "st louis" and "Saint Louis" all share one key
+    city = " ".join(city.lower().replace(".", " ").replace("-", " ").split())
+    if city.startswith("st "):
+        city = "saint " + city[3:]
+    return city
+
+
+def normalize_state(state: str) -> str | None:
+    state = " ".join(state.lower().replace(".", "").split())
+    if state.upper() in STATE_CODES.values():
+        return state.upper()
+    return STATE_CODES.get(state)
+
+
+def place_key(city: str | None, state_code: str) -> str:
+    return f"{normalize_city(city) if city else ''}|{state_code.lower()}"
+
+
+def format_record(key: str, lat: float, lng: float) -> str:
+    if len(key) > KEY_WIDTH:
+        raise ValueError(f"Gazetteer key '{key}' is longer than {KEY_WIDTH} characters")
+    return f"{key:<{KEY_WIDTH}}{lat:>{COORDINATE_WIDTH}.4f}{lng:>{COORDINATE_WIDTH}.4f}\n"
+
+
+@cache
+def _table() -> mmap.mmap | None:
+    try:
+        with open(GAZETTEER_PATH, "rb") as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        logger.warning("Gazetteer not available at %s", GAZETTEER_PATH, exc_info=True)
+        return None
+
+
+def _key_at(table: mmap.mmap, index: int) -> bytes:
+    start = index * RECORD_SIZE
+    return table[start : start + KEY_WIDTH].rstrip()
+
+
+def _location_at(table: mmap.mmap, index: int) -> Location:
+    start = index * RECORD_SIZE + KEY_WIDTH
+    lat = float(table[start : start + COORDINATE_WIDTH])
+    lng = float(table[start + COORDINATE_WIDTH : start + 2 * COORDINATE_WIDTH])
+    return Location(type="Point", coordinates=[lng, lat])
+
+
+def _lower_bound(table: mmap.mmap, key: bytes) -> int:
+    low, high = 0, len(table) // RECORD_SIZE
+    while low < high:
+        mid = (low + high) // 2
+        if _key_at(table, mid) < key:
+            low = mid + 1
+        else:
+            high = mid
+    return low
+
+
+def lookup(city: str | None, state: str | None) -> Location | None:
+    """
+    Coordinates for a city, a city in a state, or a whole state. Returns None for places the
+    table doesn't know, and for a bare city name that exists in more than one state.
+    """
+    city = city.strip() if city else None
+    state_code = normalize_state(state) if state and state.strip() else None
+    if (state and state.strip() and state_code is None) or not (city or state_code):
+        return None
+
+    table = _table()
+    if table is None:
+        return None
+    size = len(table) // RECORD_SIZE
+
+    if state_code is None:
+        prefix = f"{normalize_city(city)}|".encode()
+        index = _lower_bound(table, prefix)
+        is_match = index < size and _key_at(table, index).startswith(prefix)
+        is_unique = index + 1 >= size or not _key_at(table, index + 1).startswith(prefix)
+        return _location_at(table, index) if is_match and is_unique else None
+
+    key = place_key(city, state_code).encode()
+    index = _lower_bound(table, key)
+    if index < size and _key_at(table, index) == key:
+        return _location_at(table, index)
+    return None
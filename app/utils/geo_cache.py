@@ -0,0 +1,150 @@
+import hashlib
+import logging
+import math
+from bisect import bisect_left
+from collections.abc import Callable
+from typing import TYPE_CHECKING, Any
+
+from bson import ObjectId, json_util
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.services.cache import cache_service
+from app.utils import geohash
+
+if TYPE_CHECKING:
+    from motor.motor_asyncio import AsyncIOMotorCollection
+
+logger = logging.getLogger(__name__)
+
+# Same sphere as Mongo's 2dsphere distance calculations
+EARTH_RADIUS_METERS = 6378100.0
+# Requested radii are rounded up to one of these so nearby users share a cache entry
+RADIUS_BUCKETS_METERS = [1_000, 2_000, 5_000, 10_000, 25_000, 50_000, 100_000, 250_000, 500_000]
+GEO_CACHE_EXPIRE_SECONDS = 60
+# Supersets larger than this aren't cached; the caller runs its own query instead
+MAX_SUPERSET_SIZE = 1000
+
+
+def _haversine_meters(lng1: float, lat1: float, lng2: float, lat2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = (
+        math.sin((phi2 - phi1) / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lng2 - lng1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_METERS * math.asin(math.sqrt(min(a, 1.0)))
+
+
+def _radius_bucket(max_distance_meters: float) -> float:
+    index = bisect_left(RADIUS_BUCKETS_METERS, max_distance_meters)
+    if index < len(RADIUS_BUCKETS_METERS):
+        return RADIUS_BUCKETS_METERS[index]
+    return math.ceil(max_distance_meters / 100_000) * 100_000
+
+
+async def find_near_cached(
+    namespace: str,
+    collection: "AsyncIOMotorCollection",
+    query: dict,
+    lng: float,
+    lat: float,
+    max_distance_meters: float,
+    exclude_fields: tuple[str, ...] = (),
+) -> list[dict] | None:
+    """
+    Same documents and order as a $geoNear with this query and radius, with `distance` set
+    and `exclude_fields` left out.
+
+    The point is snapped to its geohash cell and the radius to a bucket. The cached entry
+    holds every match within the bucket radius of any point in the cell, so each request
+    only recomputes distances and drops what falls outside its own radius. Returns None
+    when the superset is too large to cache. Writers call invalidate_near_cache so cached
+    entries don't outlive the documents they were built from.
+    """
+    cell = geohash.encode(lat, lng, settings.GEO_CACHE_PRECISION)
+    south, west, north, east = geohash.bounds(cell)
+    center_lat, center_lng = (south + north) / 2, (west + east) / 2
+    # Any point in the cell is within this distance of its center
+    cell_radius = max(
+        _haversine_meters(center_lng, center_lat, east, north),
+        _haversine_meters(center_lng, center_lat, east, south),
+    )
+    bucket = _radius_bucket(max_distance_meters)
+
+    query_key = json_util.dumps([query, list(exclude_fields)], sort_keys=True)
+    query_hash = hashlib.sha1(query_key.encode()).hexdigest()[:16]
+
+    async def load_superset() -> dict:
+        pipeline = [
+            {
+                "$geoNear": {
+                    "near": {"type": "Point", "coordinates": [center_lng, center_lat]},
+                    "distanceField": "distance",
+                    "maxDistance": bucket + cell_radius,
+                    "spherical": True,
+                    "query": query,
+                }
+            },
+            {"$limit": MAX_SUPERSET_SIZE + 1},
+        ]
+        if exclude_fields:
+            pipeline.append({"$project": {field: 0 for field in exclude_fields}})
+        docs = await collection.aggregate(pipeline).to_list(length=None)
+        if len(docs) > MAX_SUPERSET_SIZE:
+            return {"complete": False, "docs": None}
+        # Extended JSON keeps ObjectIds and datetimes intact through the cache
+        return {"complete": True, "docs": json_util.dumps(docs)}
+
+    superset = await cache_service.get_or_set(
+        namespace,
+        f"{query_hash}:{cell}:{int(bucket)}",
+        load_superset,
+        expire=GEO_CACHE_EXPIRE_SECONDS,
+    )
+    if not superset["complete"]:
+        return None
+
+    docs = []
+    for doc in json_util.loads(superset["docs"]):
+        doc_lng, doc_lat = doc["location"]["coordinates"][:2]
+        distance = _haversine_meters(lng, lat, doc_lng, doc_lat)
+        if distance <= max_distance_meters:
+            doc["distance"] = distance
+            docs.append(doc)
+    return sort_documents(docs, "distance", 1)
+
+
+async def invalidate_near_cache(namespace: str) -> None:
+    # Geo namespaces are versioned, so this drops every cell and radius at once. A failure
+    # mustn't fail the write that triggered it; entries expire on their own
+    try:
+        await cache_service.bump_generation(namespace)
+    except RedisError:
+        logger.warning(f"Could not invalidate {namespace}", exc_info=True)
+
+
+def _bson_sort_key(value: Any) -> tuple:
+    # Mirror Mongo's ordering across types: null, numbers, strings, ObjectId, bool, date
+    if value is None:
+        return (0,)
+    if isinstance(value, bool):
+        return (5, value)
+    if isinstance(value, int | float):
+        return (1, value)
+    if isinstance(value, str):
+        return (2, value)
+    if isinstance(value, ObjectId):
+        return (4, value)
+    if hasattr(value, "isoformat"):
+        return (6, value)
+    return (3, str(value))
+
+
+def sort_documents(
+    docs: list[dict], key: str | Callable[[dict], Any], direction: int
+) -> list[dict]:
+    """Sort like Mongo's {key: direction, _id: 1}."""
+    get_value = key if callable(key) else (lambda doc: doc.get(key))
+    docs = sorted(docs, key=lambda doc: _bson_sort_key(doc.get("_id")))
+    # Stable sort, so ties keep the ascending _id order
+    return sorted(docs, key=lambda doc: _bson_sort_key(get_value(doc)), reverse=direction == -1)
@@ -0,0 +1,109 @@
+import math
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from motor.motor_asyncio import AsyncIOMotorCollection
+
+MIN_MAP_ZOOM = 2
+MAX_MAP_ZOOM = 20
+# Each tile is split into a TILE_GRID_SIZE x TILE_GRID_SIZE grid of clusters
+TILE_GRID_SIZE = 8
+MAX_TILES_PER_REQUEST = 64
+# 2dsphere polygons can't reach the poles
+MAX_LATITUDE = 85.0
+# Polygon edges are geodesic, so the index lookup is padded and the exact tile bounds are
+# applied to the coordinates afterwards
+POLYGON_PADDING_DEGREES = 0.5
+
+
+def tile_size(zoom: int) -> float:
+    # Tiles are square in degrees: 2^zoom columns of longitude, half as many rows of latitude
+    return 360 / 2**zoom
+
+
+def tiles_for_bbox(
+    west: float, south: float, east: float, north: float, zoom: int
+) -> list[tuple[int, int]]:
+    size = tile_size(zoom)
+    columns = 2**zoom
+    rows = columns // 2
+
+    def column(lng: float) -> int:
+        return min(columns - 1, int((lng + 180) // size))
+
+    def row(lat: float) -> int:
+        return min(rows - 1, int((lat + 90) // size))
+
+    if west <= east:
+        xs = list(range(column(west), column(east) + 1))
+    else:
+        # The box crosses the antimeridian
+        xs = [*range(column(west), columns), *range(0, column(east) + 1)]
+    return [(x, y) for x in xs for y in range(row(south), row(north) + 1)]
+
+
+def tile_bounds(x: int, y: int, zoom: int) -> tuple[float, float, float, float]:
+    size = tile_size(zoom)
+    return -180 + x * size, -90 + y * size, -180 + (x + 1) * size, -90 + (y + 1) * size
+
+
+def _search_polygon(west: float, south: float, east: float, north: float) -> dict:
+    west = max(-180.0, west - POLYGON_PADDING_DEGREES)
+    east = min(180.0, east + POLYGON_PADDING_DEGREES)
+    south = max(-MAX_LATITUDE, south - POLYGON_PADDING_DEGREES)
+    north = min(MAX_LATITUDE, north + POLYGON_PADDING_DEGREES)
+    # Add a vertex every degree so the long edges stay close to their parallels
+    steps = max(1, math.ceil(east - west))
+    lngs = [west + (east - west) * i / steps for i in range(steps + 1)]
+    ring = [[lng, south] for lng in lngs] + [[lng, north] for lng in reversed(lngs)]
+    ring.append(ring[0])
+    return {"type": "Polygon", "coordinates": [ring]}
+
+
+async def cluster_tile(
+    collection: "AsyncIOMotorCollection", match: dict, x: int, y: int, zoom: int
+) -> list[dict]:
+    """
+    Group the documents of one tile into grid cells, returning the count and centroid of
+    each non-empty cell. Uses the collection's 2dsphere index on `location`.
+    """
+    west, south, east, north = tile_bounds(x, y, zoom)
+    search_polygon = _search_polygon(west, south, east, north)
+    cell_size = (east - west) / TILE_GRID_SIZE
+    lng = {"$arrayElemAt": ["$location.coordinates", 0]}
+    lat = {"$arrayElemAt": ["$location.coordinates", 1]}
+    pipeline = [
+        {
+            "$match": {
+                **match,
+                "location": {"$geoWithin": {"$geometry": search_polygon}},
+                "location.coordinates.0": {"$gte": west, "$lt": east},
+                "location.coordinates.1": {"$gte": south, "$lt": north},
+            }
+        },
+        {
+            "$group": {
+                "_id": {
+                    "x": {"$floor": {"$divide": [{"$subtract": [lng, west]}, cell_size]}},
+                    "y": {"$floor": {"$divide": [{"$subtract": [lat, south]}, cell_size]}},
+                },
+                "count": {"$sum": 1},
+                "lng": {"$avg": lng},
+                "lat": {"$avg": lat},
+                "id": {"$first": "$_id"},
+            }
+        },
+    ]
+
+    clusters = []
+    async for group in collection.aggregate(pipeline):
+        clusters.append(
+            {
+                "lat": group["lat"],
+                "lng": group["lng"],
+                "count": group["count"],
+                # A single point links straight to its document
+                "id": str(group["id"]) if group["count"] == 1 else None,
+            }
+        )
+    return clusters
@@ -0,0 +1,38 @@
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from motor.motor_asyncio import AsyncIOMotorCollection
+
+MAX_PAGE_SIZE = 200
+
+
+async def paginate(
+    collection: "AsyncIOMotorCollection",
+    match: dict,
+    sort: dict,
+    page: int = 1,
+    limit: int = 20,
+) -> tuple[list[dict], int]:
+    """
+    Fetch one page of documents and the total number of matches in a single round trip.
+    The sort should be backed by an index that starts with the fields in `match`.
+    """
+    skip = max(0, (page - 1) * max(1, limit))
+    safe_limit = max(1, min(MAX_PAGE_SIZE, limit))
+    pipeline = [
+        {"$match": match},
+        # Sub-pipelines of $facet can't use indexes, so sort before it to stream the matches
+        # in index order instead of sorting them in memory on every page
+        {"$sort": sort},
+        {
+            "$facet": {
+                "items": [{"$skip": skip}, {"$limit": safe_limit}],
+                "total": [{"$count": "count"}],
+            }
+        },
+    ]
+    result = await collection.aggregate(pipeline).to_list(length=1)
+    if not result:
+        return [], 0
+    total = result[0]["total"][0]["count"] if result[0]["total"] else 0
+    return result[0]["items"], total
@@ -0,0 +1,80 @@
+import csv
+import io
+import json
+from collections.abc import AsyncIterator
+from typing import Literal
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+StreamFormat = Literal["ndjson", "csv"]
+
+STREAM_MEDIA_TYPES: dict[str, StreamFormat] = {
+    "application/x-ndjson": "ndjson",
+    "text/csv": "csv",
+}
+
+# Rows are buffered and written to the socket in chunks of this many
+STREAM_CHUNK_ROWS = 100
+
+
+def get_stream_format(request: Request) -> StreamFormat | None:
+    """
+    Streaming is opt-in through the Accept header. Anything else, including */*, keeps the
+    regular JSON array response.
+    """
+    for media_range in request.headers.get("accept", "").split(","):
+        media_type = media_range.split(";")[0].strip().lower()
+        if media_type in STREAM_MEDIA_TYPES:
+            return STREAM_MEDIA_TYPES[media_type]
+    return None
+
+
+def _csv_value(value):
+    if isinstance(value, dict | list):
+        return json.dumps(value)
+    return value
+
+
+async def _ndjson_rows(models: AsyncIterator[BaseModel]) -> AsyncIterator[str]:
+    chunk: list[str] = []
+    async for model in models:
+        chunk.append(model.model_dump_json() + "\n")
+        if len(chunk) >= STREAM_CHUNK_ROWS:
+            yield "".join(chunk)
+            chunk = []
+    if chunk:
+        yield "".join(chunk)
+
+
+async def _csv_rows(models: AsyncIterator[BaseModel]) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = None
+    rows = 0
+    async for model in models:
+        row = model.model_dump(mode="json")
+        if writer is None:
+            # Columns come from the first row; every row is the same model
+            writer = csv.DictWriter(buffer, fieldnames=list(row), extrasaction="ignore")
+            writer.writeheader()
+        writer.writerow({key: _csv_value(value) for key, value in row.items()})
+        rows += 1
+        if rows % STREAM_CHUNK_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def stream_models(
+    models: AsyncIterator[BaseModel], stream_format: StreamFormat
+) -> StreamingResponse:
+    """
+    Serialize models as they come off the cursor, so memory use does not grow with the
+    size of the result.
+    """
+    if stream_format == "csv":
+        return StreamingResponse(_csv_rows(models), media_type="text/csv")
+    return StreamingResponse(_ndjson_rows(models), media_type="application/x-ndjson")
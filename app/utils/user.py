@@ -1,3 +1,5 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
 from fastapi import HTTPException, status
@@ -10,13 +12,26 @@ from app.schemas.user import User, UserType
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt is CPU bound and releases the GIL, so it runs in a bounded pool instead of
+# blocking the event loop. Excess calls queue on the semaphore rather than in the pool.
+_password_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASHING_MAX_WORKERS, thread_name_prefix="password-hashing"
+)
+_password_semaphore = asyncio.Semaphore(settings.PASSWORD_HASHING_MAX_WORKERS)
 
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
 
+async def _run_password_task(func, *args):
+    async with _password_semaphore:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_password_executor, func, *args)
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+
+async def hash_password(password: str) -> str:
+    return await _run_password_task(pwd_context.hash, password)
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await _run_password_task(pwd_context.verify, plain_password, hashed_password)
 
 
 # JWT token generation